@@ -4,6 +4,29 @@ PromptOS - A tool to improve and refineprompts
 
 __version__ = "0.1.0"
 
-from .prompt_grader import grade_prompt
+__all__ = [
+    "grade_prompt",
+    "Criterion",
+    "register_criterion",
+    "get_sampling_stats",
+    "get_token_usage",
+]
 
-__all__ = ["grade_prompt"]
+# Where each public name lives; modules are imported on first use so that
+# the CLI can hand off to a running daemon without loading LangChain
+_EXPORTS = {
+    "grade_prompt": "prompt_grader",
+    "Criterion": "criteria",
+    "register_criterion": "criteria",
+    "get_sampling_stats": "sampling",
+    "get_token_usage": "usage",
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        import importlib
+
+        module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
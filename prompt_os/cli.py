@@ -3,14 +3,791 @@ Command-line interface for PromptOS
 """
 
 import argparse
+import contextlib
+import json
+import os
 import sys
-from .prompt_grader import grade_prompt
 from yaspin import yaspin
 
+# Grading modules are imported inside the commands that need them, so that a
+# grading forwarded to the daemon never pays for loading LangChain
+
+
+def positive_int(value):
+    """argparse type for options that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
+def positive_float(value):
+    """argparse type for options that must be greater than 0"""
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be a positive number, got {value}")
+    return number
+
+
+def print_error(error):
+    """Print an error, with a hint when it is caused by a missing API key"""
+    print(f"❌ Error: {error}")
+    if "OPENAI_API_KEY" in str(error):
+        print("💡 Make sure to set your OPENAI_API_KEY environment variable")
+
+
+def add_grading_arguments(parser):
+    """Add the options that control how prompts are graded"""
+
+    parser.add_argument(
+        "--model",
+        "-m",
+        default="gpt-5",
+        help="OpenAI model to use (default: gpt-5)",
+    )
+
+    parser.add_argument(
+        "--criteria",
+        "-c",
+        help="Comma-separated criteria to grade (default: ambiguity,contradictions,context,grammar)",
+    )
+
+    parser.add_argument(
+        "--parallel",
+        "-p",
+        action="store_true",
+        help="Grade each criterion in its own concurrent request (no overall assessment)",
+    )
+
+    parser.add_argument(
+        "--samples",
+        "-n",
+        type=positive_int,
+        default=1,
+        help="Maximum gradings to sample per prompt; stops early once scores agree (default: 1)",
+    )
+
+    parser.add_argument(
+        "--tolerance",
+        type=int,
+        default=1,
+        help="Largest spread between sampled scores that counts as agreement (default: 1)",
+    )
+
+    parser.add_argument(
+        "--detail",
+        "-d",
+        choices=["scores-only", "brief", "full"],
+        default="full",
+        help="How much the model writes: scores only, one-sentence explanations, or detailed ones; less is faster and cheaper (default: full)",
+    )
+
+
+def grading_options(args):
+    """Keyword arguments for grade_prompt from the parsed grading options"""
+
+    options = {}
+    if args.criteria:
+        options["criteria"] = [
+            name.strip() for name in args.criteria.split(",") if name.strip()
+        ]
+    if args.parallel:
+        options["parallel"] = True
+    if args.samples > 1:
+        options["samples"] = args.samples
+        options["tolerance"] = args.tolerance
+    if args.detail != "full":
+        options["detail"] = args.detail
+    return options
+
+
+def print_token_usage():
+    """Print the tokens used by the gradings made in this process"""
+    from .usage import get_token_usage
+
+    for detail, usage in get_token_usage().items():
+        print(
+            f"🔢 Tokens ({detail}): {usage['input_tokens']} in, "
+            f"{usage['output_tokens']} out over {usage['requests']} requests"
+        )
+
+
+def print_sampling_stats():
+    """Print how many samples self-consistency gradings needed"""
+    from .sampling import get_sampling_stats
+
+    stats = get_sampling_stats()
+    if not stats["gradings"]:
+        return
+    print(
+        f"🎲 Sampling: {stats['average_samples']:.2f} samples per grading on average, "
+        f"{stats['early_stops']}/{stats['gradings']} stopped early, "
+        f"{stats['samples_saved']:.0%} of the sample budget saved"
+    )
+
+
+def watch_main(argv):
+    """Grade the prompt files in a directory, re-grading them as they change"""
+    from .watch import DEFAULT_EXTENSIONS, grade_changed, watch
+
+    parser = argparse.ArgumentParser(
+        prog="prompt-os watch",
+        description="Grade the prompt files in a directory and keep them graded",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  prompt-os watch prompts/
+  prompt-os watch prompts/ --changed-only
+  prompt-os watch prompts/ --ext .txt --ext .jinja
+        """,
+    )
+
+    parser.add_argument("directory", help="Directory containing prompt files")
+
+    add_grading_arguments(parser)
+
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Grade new and modified files once and exit instead of watching",
+    )
+
+    parser.add_argument(
+        "--ext",
+        action="append",
+        dest="extensions",
+        help=f"File extension to treat as a prompt, repeatable (default: {' '.join(DEFAULT_EXTENSIONS)})",
+    )
+
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=4,
+        help="Maximum number of prompts graded concurrently (default: 4)",
+    )
+
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=1.0,
+        help="Seconds to wait for edits to settle before grading (default: 1.0)",
+    )
+
+    args = parser.parse_args(argv)
+    extensions = tuple(args.extensions or DEFAULT_EXTENSIONS)
+
+    def report(path, result, error):
+        if error is not None:
+            print(f"❌ {path}: {error}")
+        elif result is None:
+            print(f"❌ {path}: No result received from the grading")
+        else:
+            print(f"📊 {path}: {result['overall_score']}/10")
+
+    try:
+        if args.changed_only:
+            graded = grade_changed(
+                args.directory,
+                args.model,
+                extensions,
+                args.workers,
+                report,
+                grading_options(args),
+            )
+            if not graded:
+                print("✅ All prompt files are up to date")
+            print_sampling_stats()
+            print_token_usage()
+        else:
+            print(f"👀 Watching {args.directory} (Ctrl+C to stop)")
+            watch(
+                args.directory,
+                args.model,
+                extensions,
+                args.workers,
+                debounce=args.debounce,
+                on_result=report,
+                grade_options=grading_options(args),
+            )
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    except ValueError as e:
+        print_error(e)
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        sys.exit(1)
+
+
+def scan_main(argv):
+    """Extract the prompts embedded in a source tree and grade them"""
+    from .scan import extract_prompts, scan
+
+    parser = argparse.ArgumentParser(
+        prog="prompt-os scan",
+        description="Extract the prompts in a source tree and grade them",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  prompt-os scan services/
+  prompt-os scan services/ --list
+  prompt-os scan services/ --output grades.jsonl
+        """,
+    )
+
+    parser.add_argument("path", help="File or directory to scan")
+
+    add_grading_arguments(parser)
+
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="List the extracted prompts without grading them",
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Write one JSON line per distinct prompt to this file",
+    )
+
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=4,
+        help="Maximum number of prompts graded concurrently (default: 4)",
+    )
+
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Number of processes used to parse files (default: number of cores)",
+    )
+
+    args = parser.parse_args(argv)
+
+    def location(entry):
+        first = entry["locations"][0]
+        text = f"{first['path']}:{first['line']}"
+        if len(entry["locations"]) > 1:
+            text += f" (+{len(entry['locations']) - 1} more)"
+        return text
+
+    def report(entry, result, error):
+        if error is not None:
+            print(f"❌ {location(entry)}: {error}")
+        elif result is None:
+            print(f"❌ {location(entry)}: No result received from the grading")
+        else:
+            print(f"📊 {result['overall_score']}/10  {location(entry)}")
+
+    try:
+        if args.list:
+            extracted = extract_prompts(args.path, args.parse_workers)
+            for entry in extracted:
+                preview = " ".join(entry["prompt"].split())[:60]
+                print(f"📝 {location(entry)}: {preview}")
+        else:
+            extracted = scan(
+                args.path,
+                args.model,
+                args.workers,
+                args.parse_workers,
+                report,
+                grading_options(args),
+            )
+        print(f"\n🔍 Found {len(extracted)} distinct prompts")
+        print_sampling_stats()
+        print_token_usage()
+
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                for entry in extracted:
+                    f.write(json.dumps(entry) + "\n")
+    except ValueError as e:
+        print_error(e)
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        sys.exit(1)
+
+
+def loadgen_main(argv):
+    """Replay grading traffic and report throughput, latency and errors"""
+    from .loadgen import (
+        compare_detail_levels,
+        load_traffic,
+        run_load_test,
+        synthetic_traffic,
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="prompt-os loadgen",
+        description="Replay grading traffic against the grader for capacity planning",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Traffic files hold one JSON object per line with the arrival time in seconds
+("t") and the "prompt" text or its size in "prompt_chars".
+
+Examples:
+  prompt-os loadgen traffic.jsonl --speedup 10 --concurrency 16
+  prompt-os loadgen --rate 20 --duration 30 --output report.json
+  prompt-os loadgen --target daemon --rate 20
+  prompt-os loadgen --compare-detail --output detail.json
+        """,
+    )
+
+    parser.add_argument(
+        "traffic",
+        nargs="?",
+        help="Recorded traffic to replay (default: synthetic traffic, see --rate)",
+    )
+
+    add_grading_arguments(parser)
+
+    parser.add_argument(
+        "--speedup",
+        type=positive_float,
+        default=1.0,
+        help="Replay arrivals this many times faster than recorded (default: 1.0)",
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=positive_int,
+        default=8,
+        help="Number of prompts graded at once (default: 8)",
+    )
+
+    parser.add_argument(
+        "--window",
+        type=positive_float,
+        default=1.0,
+        help="Width in seconds of the timeline buckets (default: 1.0)",
+    )
+
+    parser.add_argument(
+        "--rate",
+        type=positive_float,
+        default=10.0,
+        help="Requests per second of synthetic traffic (default: 10)",
+    )
+
+    parser.add_argument(
+        "--duration",
+        type=positive_float,
+        default=10.0,
+        help="Seconds of synthetic traffic (default: 10)",
+    )
+
+    parser.add_argument(
+        "--backend",
+        choices=["fake", "openai"],
+        default="fake",
+        help="Grade against a local fake backend or the OpenAI API (default: fake)",
+    )
+
+    parser.add_argument(
+        "--target",
+        choices=["in-process", "daemon"],
+        default="in-process",
+        help="Grade in this process or send requests to a running prompt-os daemon, which uses its own backend (default: in-process)",
+    )
+
+    parser.add_argument(
+        "--compare-detail",
+        action="store_true",
+        help="Replay the traffic once per detail level and report the latency and token reduction of each",
+    )
+
+    parser.add_argument(
+        "--fake-latency",
+        type=float,
+        default=0.2,
+        help="Fixed seconds of latency per fake backend request (default: 0.2)",
+    )
+
+    parser.add_argument(
+        "--fake-capacity",
+        type=positive_int,
+        default=16,
+        help="Requests the fake backend serves at once (default: 16)",
+    )
+
+    parser.add_argument(
+        "--fake-error-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of fake backend requests that fail (default: 0)",
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Write the JSON report to this file instead of stdout",
+    )
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.traffic:
+            traffic = load_traffic(args.traffic)
+        else:
+            traffic = synthetic_traffic(args.rate, args.duration)
+
+        backend_options = {}
+        if args.backend == "fake":
+            backend_options = {
+                "base_latency": args.fake_latency,
+                "capacity": args.fake_capacity,
+                "error_rate": args.fake_error_rate,
+            }
+
+        # The spinner would corrupt a report written to stdout
+        if args.output:
+            progress = yaspin(text=f"Replaying {len(traffic)} requests...")
+        else:
+            progress = contextlib.nullcontext()
+
+        with progress:
+            if args.compare_detail:
+                if args.target != "in-process":
+                    raise ValueError("--compare-detail only supports --target in-process")
+                report = compare_detail_levels(
+                    traffic,
+                    args.model,
+                    args.speedup,
+                    args.concurrency,
+                    args.window,
+                    args.backend,
+                    backend_options,
+                    grading_options(args),
+                )
+            else:
+                report = run_load_test(
+                    traffic,
+                    args.model,
+                    args.speedup,
+                    args.concurrency,
+                    args.window,
+                    args.backend,
+                    backend_options,
+                    grading_options(args),
+                    args.target,
+                )
+
+        output = json.dumps(report, indent=2)
+        if args.output and report["config"]["modelled"]:
+            print(f"⚠️  {report['config']['note']}")
+        if args.output and args.compare_detail:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(output + "\n")
+            for detail, level in report["levels"].items():
+                reduction = level["reduction"]
+                print(
+                    f"📊 {detail}: mean latency {level['latency']['mean'] or 0:.2f}s "
+                    f"({reduction['latency_mean'] or 0:.0%} less), "
+                    f"{level['output_tokens_per_request']:.0f} output tokens per request "
+                    f"({reduction['output_tokens'] or 0:.0%} less)"
+                )
+            print(f"📝 Report written to {args.output}")
+        elif args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(output + "\n")
+            summary = report["summary"]
+            print(
+                f"📊 {summary['throughput']:.2f} gradings/s, "
+                f"p95 latency {summary['latency']['p95'] or 0:.2f}s, "
+                f"max queue depth {summary['max_queue_depth']}, "
+                f"error rate {summary['error_rate']:.1%}"
+            )
+            print(f"📝 Report written to {args.output}")
+        else:
+            print(output)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        sys.exit(1)
+
+
+def queue_main(argv):
+    """Manage a work queue shared by prompt-os worker processes"""
+    from .workqueue import WorkQueue, read_prompt_inputs
+
+    parser = argparse.ArgumentParser(
+        prog="prompt-os queue",
+        description="Manage a grading work queue shared by prompt-os workers",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  prompt-os queue add corpus.db prompts.jsonl prompts/
+  prompt-os queue status corpus.db
+  prompt-os queue results corpus.db --output grades.jsonl
+        """,
+    )
+
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    add_parser = subparsers.add_parser("add", help="Add prompts to the queue")
+    add_parser.add_argument("database", help="Queue database, created if missing")
+    add_parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Prompt files, directories of prompt files or .jsonl files with a 'prompt' per line",
+    )
+
+    status_parser = subparsers.add_parser(
+        "status", help="Show progress and per-worker throughput"
+    )
+    status_parser.add_argument("database", help="Queue database")
+    status_parser.add_argument(
+        "--json", action="store_true", help="Print the progress as JSON"
+    )
+
+    results_parser = subparsers.add_parser("results", help="Export recorded results")
+    results_parser.add_argument("database", help="Queue database")
+    results_parser.add_argument(
+        "--output", "-o", help="Write the results to this file instead of stdout"
+    )
+
+    args = parser.parse_args(argv)
+
+    try:
+        with WorkQueue(args.database) as queue:
+            if args.action == "add":
+                skipped = []
+
+                def skip(path, error):
+                    skipped.append(path)
+                    print(f"⚠️  Skipping {path}: {error}")
+
+                added = queue.enqueue(read_prompt_inputs(args.inputs, on_skip=skip))
+                note = f" ({len(skipped)} unreadable files skipped)" if skipped else ""
+                print(f"✅ Added {added} prompts to {args.database}{note}")
+
+            elif args.action == "status":
+                progress = queue.progress()
+                if args.json:
+                    print(json.dumps(progress, indent=2))
+                    return
+
+                jobs = progress["jobs"]
+                print(
+                    f"📊 {progress['finished']:.1%} finished of {progress['total']} jobs: "
+                    f"{jobs['done']} done, {jobs['failed']} failed, "
+                    f"{jobs['pending']} pending, {jobs['leased']} in progress, "
+                    f"{jobs['expired']} with expired leases"
+                )
+                for worker in progress["workers"]:
+                    print(
+                        f"  👷 {worker['id']}: {worker['completed']} done, "
+                        f"{worker['failed']} failed, {worker['throughput']:.2f} jobs/s"
+                    )
+
+            else:
+                if args.output:
+                    output = open(args.output, "w", encoding="utf-8")
+                else:
+                    output = contextlib.nullcontext(sys.stdout)
+                with output as f:
+                    for record in queue.results():
+                        f.write(json.dumps(record) + "\n")
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        sys.exit(1)
+
+
+def worker_main(argv):
+    """Grade jobs from a work queue"""
+    from .workqueue import DEFAULT_LEASE, DEFAULT_MAX_ATTEMPTS, run_worker
+
+    parser = argparse.ArgumentParser(
+        prog="prompt-os worker",
+        description="Grade jobs from a work queue created with prompt-os queue add",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  prompt-os worker corpus.db
+  prompt-os worker /shared/corpus.db --concurrency 16 --follow
+        """,
+    )
+
+    parser.add_argument("database", help="Queue database")
+
+    add_grading_arguments(parser)
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of prompts graded at once (default: 4)",
+    )
+
+    parser.add_argument(
+        "--lease",
+        type=float,
+        default=DEFAULT_LEASE,
+        help=f"Seconds a claimed job is reserved before another worker may take it (default: {DEFAULT_LEASE:g})",
+    )
+
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        help=f"Claims after which a failing job is marked failed (default: {DEFAULT_MAX_ATTEMPTS})",
+    )
+
+    parser.add_argument(
+        "--follow",
+        "-f",
+        action="store_true",
+        help="Keep waiting for new jobs instead of exiting when the queue is empty",
+    )
+
+    parser.add_argument(
+        "--verbose", "-v", action="store_true", help="Print every finished job"
+    )
+
+    args = parser.parse_args(argv)
+
+    counts = {"done": 0, "failed": 0, "lost": 0}
+
+    def report(job, result, error):
+        label = job["source"] or f"job {job['id']}"
+        if error is not None:
+            counts["failed"] += 1
+            print(f"❌ {label}: {error}")
+        else:
+            counts["done"] += 1
+            if args.verbose:
+                print(f"📊 {label}: {result['overall_score']}/10")
+
+    def lease_lost(job):
+        counts["lost"] += 1
+        label = job["source"] or f"job {job['id']}"
+        print(f"⚠️  {label}: lease lost to another worker, result discarded")
+
+    try:
+        worker_id = run_worker(
+            args.database,
+            args.model,
+            args.concurrency,
+            args.lease,
+            args.max_attempts,
+            args.follow,
+            grade_options=grading_options(args),
+            on_result=report,
+            on_lease_lost=lease_lost,
+        )
+        print(
+            f"✅ Worker {worker_id} finished: {counts['done']} graded, "
+            f"{counts['failed']} failed, {counts['lost']} lost to other workers"
+        )
+    except KeyboardInterrupt:
+        print("\n👋 Worker stopped, unfinished jobs will be picked up once their lease expires")
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        sys.exit(1)
+
+
+def daemon_main(argv):
+    """Start, stop or inspect the background grading daemon"""
+    from . import daemon
+
+    parser = argparse.ArgumentParser(
+        prog="prompt-os daemon",
+        description="Keep a warm grader running so prompt-os invocations skip startup",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+While a daemon is running, prompt-os "<prompt>" forwards the grading to it
+and falls back to grading in-process when it is not.
+
+Examples:
+  prompt-os daemon start
+  prompt-os daemon status
+  prompt-os daemon stop
+        """,
+    )
+
+    parser.add_argument(
+        "action",
+        choices=["start", "stop", "status", "run"],
+        help="start in the background, stop, show status, or run in the foreground",
+    )
+
+    parser.add_argument(
+        "--socket",
+        default=daemon.default_socket_path(),
+        help="Unix socket to listen on (default: $PROMPT_OS_SOCKET or a per-user socket in the temp directory)",
+    )
+
+    parser.add_argument(
+        "--backend",
+        choices=["openai", "fake"],
+        default="openai",
+        help="Grade with the OpenAI API or a local fake backend (default: openai)",
+    )
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.action == "run":
+            daemon.serve(args.socket, args.backend)
+
+        elif args.action == "start":
+            with yaspin(text="Starting daemon..."):
+                pid = daemon.start(args.socket, args.backend)
+            if pid is None:
+                print(f"✅ Daemon already running on {args.socket}")
+            else:
+                print(f"✅ Daemon {pid} listening on {args.socket}")
+
+        elif args.action == "stop":
+            if not daemon.stop(args.socket):
+                print("💤 No daemon running")
+            else:
+                print("👋 Daemon stopped")
+
+        else:
+            status = daemon.request({"command": "ping"}, args.socket)
+            if status is None:
+                print("💤 No daemon running")
+            else:
+                cache = status["cache"]
+                print(
+                    f"✅ Daemon {status['pid']} ({status['backend']} backend) "
+                    f"up for {status['uptime']:.0f}s, "
+                    f"{status['served']} gradings served, "
+                    f"cache {cache['entries']} entries "
+                    f"({cache['hits']} hits, {cache['misses']} misses)"
+                )
+    except KeyboardInterrupt:
+        print("\n👋 Daemon stopped")
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        sys.exit(1)
+
+
+COMMANDS = {
+    "watch": watch_main,
+    "scan": scan_main,
+    "loadgen": loadgen_main,
+    "queue": queue_main,
+    "worker": worker_main,
+    "daemon": daemon_main,
+}
+
 
-@yaspin(text="Grading prompt...")
 def main():
     """Main CLI function"""
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        return COMMANDS[sys.argv[1]](sys.argv[2:])
+
     parser = argparse.ArgumentParser(
         description="PromptOS - Grade your prompts using PromptOS",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -19,6 +796,14 @@ Examples:
   prompt-os "Write a story about a cat"
   prompt-os "Write a story about a cat" --grade
   prompt-os "Write a story about a cat" --model gpt-4
+  prompt-os "Write a story about a cat" --stream
+  prompt-os "Write a story about a cat" --criteria grammar,ambiguity --parallel
+  prompt-os "Write a story about a cat" --samples 5 --tolerance 1
+  prompt-os watch prompts/ --changed-only
+  prompt-os scan services/
+  prompt-os loadgen traffic.jsonl --speedup 10
+  prompt-os queue add corpus.db prompts.jsonl && prompt-os worker corpus.db
+  prompt-os daemon start
         """,
     )
 
@@ -27,12 +812,7 @@ Examples:
         help="The prompt to grade",
     )
 
-    parser.add_argument(
-        "--model",
-        "-m",
-        default="gpt-5",
-        help="OpenAI model to use (default: gpt-5)",
-    )
+    add_grading_arguments(parser)
 
     parser.add_argument(
         "--grade",
@@ -41,12 +821,29 @@ Examples:
         help="Grade the prompt on ambiguity, contradictions, and context",
     )
 
+    parser.add_argument(
+        "--stream",
+        "-s",
+        action="store_true",
+        help="Print each score and explanation as soon as it is generated",
+    )
+
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        default=bool(os.getenv("PROMPT_OS_NO_DAEMON")),
+        help="Grade in this process even if a prompt-os daemon is running",
+    )
+
     parser.add_argument(
         "--verbose", "-v", action="store_true", help="Show additional information"
     )
 
     args = parser.parse_args()
 
+    if args.stream and args.samples > 1:
+        parser.error("--stream cannot be combined with --samples")
+
     try:
         if not args.prompt:
             print("❌ Error: Please provide a prompt to grade")
@@ -57,7 +854,57 @@ Examples:
             if args.verbose:
                 print("📊 Grading prompt...")
 
-            result = grade_prompt(args.prompt, args.model)
+            options = grading_options(args)
+            labels = {}
+
+            def label(name):
+                return labels.get(name, {}).get("label") or name.title()
+
+            with yaspin(text="Grading prompt...") as spinner:
+                on_field = None
+                if args.stream:
+                    spinner.write("📈 SCORES (1-10 scale) and 📝 EXPLANATIONS:")
+
+                    def on_field(name, value):
+                        criterion, _, kind = name.rpartition("_")
+                        if criterion not in labels:
+                            return
+                        if kind == "score":
+                            spinner.write(f"  📈 {label(criterion)}: {value}/10")
+                        elif kind == "explanation":
+                            spinner.write(f"  📝 {label(criterion)}: {value}")
+
+                forwarded = None
+                if not args.no_daemon:
+                    from .daemon import DaemonRefused, try_grade
+
+                    # Grading errors inside the daemon are reported as they
+                    # are; only a refusal, before anything was graded, falls back
+                    try:
+                        forwarded = try_grade(
+                            args.prompt, args.model, options, on_field, labels.update
+                        )
+                    except DaemonRefused as e:
+                        spinner.write(f"⚠️  Not using the prompt-os daemon: {e}")
+                        spinner.write("⚠️  Grading in this process instead")
+
+                if forwarded is not None:
+                    result, _ = forwarded
+                    if args.verbose:
+                        spinner.write("⚡ Graded by the prompt-os daemon")
+                else:
+                    from .criteria import criterion_labels, get_criteria
+                    from .prompt_grader import grade_prompt
+
+                    labels.update(
+                        criterion_labels(
+                            criterion.name
+                            for criterion in get_criteria(options.get("criteria"))
+                        )
+                    )
+                    result = grade_prompt(
+                        args.prompt, args.model, on_field=on_field, **options
+                    )
 
             if result is None:
                 print("❌ Error: No result received from the grading")
@@ -69,36 +916,54 @@ Examples:
             print(f"Original prompt: {result['original_prompt']}")
             print()
 
-            print("📈 SCORES (1-10 scale):")
-            print(
-                f"  Ambiguity (10 is high amount of ambiguity): {result['ambiguity']['score']}/10"
-            )
-            print(
-                f"  Contradictions (10 is high number contradictions): {result['contradictions']['score']}/10"
-            )
-            print(
-                f"  Lack of Context (10 is a complete lack of context): {result['context']['score']}/10"
-            )
-            print(
-                f"  Grammar (10 is very poor grammar): {result['grammar']['score']}/10"
-            )
-            print()
+            graded = [name for name in result if name in labels]
 
-            print("📝 EXPLANATIONS:")
-            print(f"  Ambiguity: {result['ambiguity']['explanation']}")
-            print(f"  Contradictions: {result['contradictions']['explanation']}")
-            print(f"  Context: {result['context']['explanation']}")
-            print(f"  Grammar: {result['grammar']['explanation']}")
-            print()
+            if not args.stream:
+                # When streaming, scores and explanations were printed as they arrived
+                print("📈 SCORES (1-10 scale):")
+                for name in graded:
+                    scale = labels[name].get("scale")
+                    suffix = f" ({scale})" if scale else ""
+                    print(f"  {label(name)}{suffix}: {result[name]['score']}/10")
+                print()
+
+            if "sampling" in result:
+                sampling = result["sampling"]
+                failed = ""
+                if sampling.get("errors"):
+                    failed = f", {sampling['errors']} failed"
+                print(
+                    f"🎲 SAMPLING ({sampling['samples_used']}/{sampling['max_samples']} samples, "
+                    f"{'agreed' if sampling['agreed'] else 'did not agree'} "
+                    f"within {sampling['tolerance']}{failed}):"
+                )
+                for name in graded:
+                    low, high = result[name]["confidence_interval"]
+                    print(
+                        f"  {label(name)}: mean {result[name]['mean']:.2f}, "
+                        f"variance {result[name]['variance']:.2f}, "
+                        f"95% CI {low:.2f}-{high:.2f}"
+                    )
+                print()
+
+            if not args.stream and result.get("detail") != "scores-only":
+                print("📝 EXPLANATIONS:")
+                for name in graded:
+                    print(f"  {label(name)}: {result[name]['explanation']}")
+                print()
 
             print(f"  Overall score: {result['overall_score']}/10")
-            print("🎯 OVERALL ASSESSMENT:")
-            print(f"  {result['overall_assessment']}")
+            if result["overall_assessment"] is not None:
+                print("🎯 OVERALL ASSESSMENT:")
+                print(f"  {result['overall_assessment']}")
             print()
 
+            if args.verbose:
+                print_sampling_stats()
+                print_token_usage()
+
     except ValueError as e:
-        print(f"❌ Error: {e}")
-        print("💡 Make sure to set your OPENAI_API_KEY environment variable")
+        print_error(e)
         sys.exit(1)
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
@@ -0,0 +1,281 @@
+"""
+Registry of the criteria prompts are graded on
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, Field, create_model
+
+from .prompts import GRADER_PROMPT_FILE, load_prompt
+
+# Instruction template used when a criterion is graded on its own
+CRITERION_PROMPT_FILE = "criterion_grader.txt"
+
+# How much the model is asked to write, from least to most. Output tokens
+# dominate grading latency, so lower levels are noticeably faster:
+# - "scores-only": scores only, no explanations or overall assessment
+# - "brief": one-sentence explanations and overall assessment
+# - "full": detailed explanations
+DETAIL_LEVELS = ("scores-only", "brief", "full")
+DEFAULT_DETAIL = "full"
+
+# Instruction templates for each detail level
+GRADER_PROMPT_FILES = {
+    "scores-only": "prompt_grader_scores.txt",
+    "brief": "prompt_grader_brief.txt",
+    "full": GRADER_PROMPT_FILE,
+}
+CRITERION_PROMPT_FILES = {
+    "scores-only": "criterion_grader_scores.txt",
+    "brief": "criterion_grader_brief.txt",
+    "full": CRITERION_PROMPT_FILE,
+}
+
+# Word limit asked of brief explanations and assessments
+BRIEF_WORDS = 25
+
+
+def check_detail(detail: str) -> str:
+    """
+    Raises:
+        ValueError: If detail is not one of DETAIL_LEVELS
+    """
+
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(
+            f"Unknown detail level: {detail} (available: {', '.join(DETAIL_LEVELS)})"
+        )
+    return detail
+
+
+def criterion_schema(
+    name: str, score_description: str, explanation_description: str
+) -> Type[BaseModel]:
+    """Build the tool schema for a single criterion: `<name>_score` and `<name>_explanation`"""
+
+    return create_model(
+        f"{name.title().replace('_', '')}Grading",
+        __doc__=f"Schema for the {name} grading of a prompt",
+        **{
+            f"{name}_score": (int, Field(description=score_description, ge=1, le=10)),
+            f"{name}_explanation": (str, Field(description=explanation_description)),
+        },
+    )
+
+
+class Criterion:
+    """
+    A single criterion a prompt is graded on.
+
+    Scores run from 1 (best) to 10 (worst), matching the built-in criteria,
+    so that they can be reversed and averaged into the overall score.
+
+    Args:
+        name: Identifier used as the result key and schema field prefix
+        label: Human readable name
+        instructions: Grading instructions for this criterion
+        scale: Short description of what a high score means
+        schema: Tool schema with `<name>_score` and `<name>_explanation`
+            fields, built from the descriptions below if omitted
+        score_description: Description of the score field
+        explanation_description: Description of the explanation field
+    """
+
+    def __init__(
+        self,
+        name: str,
+        label: str,
+        instructions: str,
+        scale: str = "",
+        schema: Optional[Type[BaseModel]] = None,
+        score_description: Optional[str] = None,
+        explanation_description: Optional[str] = None,
+    ):
+        self.name = name
+        self.label = label
+        self.instructions = instructions
+        self.scale = scale
+        self.schema = schema or criterion_schema(
+            name,
+            score_description or f"{label} score (1-10 scale, 1=best, 10=worst)",
+            explanation_description or f"Detailed explanation for the {name} score",
+        )
+
+    def grading_instructions(self, detail: str = DEFAULT_DETAIL) -> str:
+        """Instructions for grading this criterion on its own"""
+        return load_prompt(CRITERION_PROMPT_FILES[check_detail(detail)]).replace(
+            "{criteria}", self.instructions
+        )
+
+    def detail_schema(self, detail: str = DEFAULT_DETAIL) -> Type[BaseModel]:
+        """Tool schema for this criterion at a detail level, see DETAIL_LEVELS"""
+        return _detail_schema(self, check_detail(detail))
+
+    def __repr__(self) -> str:
+        return f"Criterion({self.name!r})"
+
+
+@lru_cache(maxsize=None)
+def _detail_schema(criterion: Criterion, detail: str) -> Type[BaseModel]:
+    if detail == "full":
+        return criterion.schema
+
+    # Keep the criterion's own score field, so custom schemas stay in effect
+    score = criterion.schema.model_fields[f"{criterion.name}_score"]
+    fields = {f"{criterion.name}_score": (score.annotation, score)}
+    if detail == "brief":
+        fields[f"{criterion.name}_explanation"] = (
+            str,
+            Field(
+                description=f"Explanation for the {criterion.name} score "
+                f"in one sentence of at most {BRIEF_WORDS} words"
+            ),
+        )
+
+    level = "Brief" if detail == "brief" else "Scores"
+    return create_model(
+        f"{criterion.name.title().replace('_', '')}{level}Grading",
+        __doc__=f"Schema for the {criterion.name} grading of a prompt ({detail})",
+        **fields,
+    )
+
+
+CRITERIA: Dict[str, Criterion] = {}
+
+# Criteria graded when the caller does not ask for a subset
+DEFAULT_CRITERIA = ("ambiguity", "contradictions", "context", "grammar")
+
+
+def register_criterion(criterion: Criterion, replace: bool = False) -> Criterion:
+    """
+    Add a criterion to the registry.
+
+    Raises:
+        ValueError: If a criterion with the same name exists and replace is False
+    """
+
+    if criterion.name in CRITERIA and not replace:
+        raise ValueError(f"Criterion already registered: {criterion.name}")
+    CRITERIA[criterion.name] = criterion
+    return criterion
+
+
+def get_criteria(names: Optional[Iterable[str]] = None) -> List[Criterion]:
+    """
+    Look up criteria by name, defaulting to the built-in set.
+
+    Raises:
+        ValueError: If a name is not registered
+    """
+
+    names = list(DEFAULT_CRITERIA if names is None else names)
+    if not names:
+        raise ValueError("At least one criterion is required")
+
+    unknown = [name for name in names if name not in CRITERIA]
+    if unknown:
+        raise ValueError(
+            f"Unknown criteria: {', '.join(unknown)} "
+            f"(available: {', '.join(CRITERIA)})"
+        )
+    return [CRITERIA[name] for name in dict.fromkeys(names)]
+
+
+def criterion_labels(names: Iterable[str]) -> Dict[str, dict]:
+    """Display label and scale description of each named criterion"""
+    return {
+        name: {"label": CRITERIA[name].label, "scale": CRITERIA[name].scale}
+        for name in names
+    }
+
+
+def combined_instructions(
+    criteria: Sequence[Criterion], detail: str = DEFAULT_DETAIL
+) -> str:
+    """Instructions for grading several criteria in one call"""
+
+    sections = "\n\n".join(
+        f"{index}. {criterion.instructions}"
+        for index, criterion in enumerate(criteria, start=1)
+    )
+    return load_prompt(GRADER_PROMPT_FILES[check_detail(detail)]).replace(
+        "{criteria}", sections
+    )
+
+
+def combined_schema(
+    criteria: Sequence[Criterion], detail: str = DEFAULT_DETAIL
+) -> Type[BaseModel]:
+    """
+    Tool schema for grading several criteria in one call. Only the "brief"
+    and "full" detail levels include the overall assessment.
+    """
+    return _combined_schema(tuple(criteria), check_detail(detail))
+
+
+@lru_cache(maxsize=None)
+def _combined_schema(
+    criteria: Tuple[Criterion, ...], detail: str = DEFAULT_DETAIL
+) -> Type[BaseModel]:
+    fields = {}
+    for criterion in criteria:
+        for name, field in criterion.detail_schema(detail).model_fields.items():
+            fields[name] = (field.annotation, field)
+
+    if detail == "brief":
+        fields["overall_assessment"] = (
+            str,
+            Field(
+                description="Overall assessment of the prompt quality "
+                f"in one sentence of at most {BRIEF_WORDS} words"
+            ),
+        )
+    elif detail == "full":
+        fields["overall_assessment"] = (
+            str,
+            Field(description="Brief overall assessment of the prompt quality"),
+        )
+
+    return create_model(
+        "GradingResult",
+        __doc__="Schema for prompt grading results",
+        **fields,
+    )
+
+
+for _name, _label, _scale, _score_description in [
+    (
+        "ambiguity",
+        "Ambiguity",
+        "10 is high amount of ambiguity",
+        "Ambiguity score (1-10 scale, 1=no ambiguity, 10=high ambiguity)",
+    ),
+    (
+        "contradictions",
+        "Contradictions",
+        "10 is high number contradictions",
+        "Contradictions score (1-10 scale, 1=no contradictions, 10=high contradictions)",
+    ),
+    (
+        "context",
+        "Lack of Context",
+        "10 is a complete lack of context",
+        "Context score (1-10 scale, 1=no context, 10=lots of context)",
+    ),
+    (
+        "grammar",
+        "Grammar",
+        "10 is very poor grammar",
+        "Grammar score (1-10 scale, 1=perfect grammar, 10=very poor grammar)",
+    ),
+]:
+    register_criterion(
+        Criterion(
+            _name,
+            _label,
+            load_prompt(f"criteria/{_name}.txt"),
+            scale=_scale,
+            score_description=_score_description,
+        )
+    )
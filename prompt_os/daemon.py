@@ -0,0 +1,493 @@
+"""
+Background grading daemon that keeps the grader warm between CLI invocations
+
+The client half of this module only uses the standard library, so the CLI can
+forward a grading to a running daemon without importing LangChain.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+# Results kept in the daemon's cache
+CACHE_SIZE = 1024
+
+
+def default_socket_path() -> str:
+    """
+    Socket the daemon listens on, overridable with PROMPT_OS_SOCKET.
+
+    Defaults to $XDG_RUNTIME_DIR/prompt-os.sock, or a socket inside a private
+    per-user directory in the temp directory.
+    """
+
+    if os.getenv("PROMPT_OS_SOCKET"):
+        return os.environ["PROMPT_OS_SOCKET"]
+    if os.getenv("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "prompt-os.sock")
+    return os.path.join(
+        tempfile.gettempdir(), f"prompt-os-{os.getuid()}", "daemon.sock"
+    )
+
+
+class DaemonError(RuntimeError):
+    """The daemon failed to grade a prompt"""
+
+
+class DaemonRefused(DaemonError):
+    """
+    The daemon must not be used: it belongs to another user, or grades with
+    another backend or API key. Nothing was graded, so the caller can safely
+    grade in-process instead.
+    """
+
+
+def _check_owner(path: str) -> None:
+    """
+    Raises:
+        DaemonError: If the path belongs to another user, who could read
+            the prompts sent to it and answer with made-up grades
+    """
+
+    if os.stat(path).st_uid != os.getuid():
+        raise DaemonRefused(f"Refusing to use {path}: it belongs to another user")
+
+
+def _check_peer(client: socket.socket, path: str) -> None:
+    """Check the process listening on the socket runs as the current user"""
+
+    if not hasattr(socket, "SO_PEERCRED"):
+        return
+    credentials = client.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+    )
+    _, uid, _ = struct.unpack("3i", credentials)
+    if uid != os.getuid():
+        raise DaemonRefused(f"Refusing to use {path}: it is served by another user")
+
+
+def _api_key_fingerprint() -> Optional[str]:
+    """Hash of the OpenAI API key this process would grade with"""
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    key = os.getenv("OPENAI_API_KEY")
+    return hashlib.sha256(key.encode("utf-8")).hexdigest() if key else None
+
+
+def _send(path: str, message: dict, timeout: Optional[float] = None):
+    """Send one request and yield the daemon's JSON replies"""
+
+    _check_owner(path)
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    try:
+        client.connect(path)
+        _check_peer(client, path)
+        client.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        with client.makefile("r", encoding="utf-8") as replies:
+            for line in replies:
+                yield json.loads(line)
+    finally:
+        client.close()
+
+
+def request(
+    message: dict, path: Optional[str] = None, timeout: Optional[float] = 5.0
+) -> Optional[dict]:
+    """
+    Send a control message (ping, shutdown) to the daemon.
+
+    Returns:
+        The daemon's reply, or None if no daemon is listening
+    """
+
+    try:
+        for reply in _send(path or default_socket_path(), message, timeout):
+            return reply
+    except (FileNotFoundError, ConnectionError, socket.timeout):
+        # Includes a daemon that closes the connection while shutting down
+        return None
+    return None
+
+
+def stop(path: Optional[str] = None, wait: float = 10.0) -> bool:
+    """
+    Ask the daemon to shut down and wait until it has released its socket.
+
+    Returns:
+        False if no daemon was running
+    """
+
+    path = path or default_socket_path()
+    if request({"command": "shutdown"}, path) is None:
+        return False
+
+    deadline = time.monotonic() + wait
+    while os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return True
+
+
+def try_grade(
+    prompt: str,
+    model: str = "gpt-5",
+    grade_options: Optional[dict] = None,
+    on_field: Optional[Callable[[str, Any], None]] = None,
+    on_labels: Optional[Callable[[dict], None]] = None,
+    path: Optional[str] = None,
+    backend: Optional[str] = "openai",
+    use_cache: bool = True,
+) -> Optional[Tuple[Optional[dict], dict]]:
+    """
+    Grade a prompt with the daemon if one is running.
+
+    Args:
+        prompt: The prompt to grade
+        model: OpenAI model to use
+        grade_options: Extra keyword arguments for grade_prompt, e.g. criteria
+        on_field: Streaming callback, as for grade_prompt
+        on_labels: Called with the labels (see below) before any field arrives
+        path: Daemon socket, defaults to default_socket_path()
+        backend: Backend the daemon must grade with. For "openai" it must
+            also use the same API key as this process. None accepts any
+            backend, e.g. for load testing.
+        use_cache: Allow the daemon to answer from its cache of results
+
+    Returns:
+        None if no daemon is listening, so the caller can grade in-process.
+        Otherwise (result, labels), where labels maps each graded criterion
+        to its {"label", "scale"}.
+
+    Raises:
+        ValueError: The daemon rejected the request, e.g. an unknown criterion
+        DaemonRefused: The daemon belongs to another user or grades with a
+            different backend or API key; nothing was graded
+        DaemonError: Grading failed inside the daemon, e.g. an OpenAI error
+    """
+
+    message = {
+        "command": "grade",
+        "prompt": prompt,
+        "model": model,
+        "options": grade_options or {},
+        "stream": on_field is not None,
+        "backend": backend,
+        "cache": use_cache,
+    }
+    if backend == "openai":
+        message["api_key"] = _api_key_fingerprint()
+
+    labels = {}
+    try:
+        for reply in _send(path or default_socket_path(), message):
+            event = reply["event"]
+            if event == "labels":
+                labels = reply["labels"]
+                if on_labels is not None:
+                    on_labels(labels)
+            elif event == "field":
+                on_field(reply["name"], reply["value"])
+            elif event == "result":
+                return reply["result"], labels
+            elif event == "error":
+                if reply["type"] == "ValueError":
+                    raise ValueError(reply["message"])
+                if reply["type"] == "DaemonRefused":
+                    raise DaemonRefused(reply["message"])
+                raise DaemonError(reply["message"])
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+
+    raise DaemonError("Daemon closed the connection without a result")
+
+
+def _private_directory(path: str) -> None:
+    """
+    Create the socket's directory, accessible only to the current user, if
+    it does not exist yet.
+
+    Raises:
+        DaemonError: If another user owns the directory and could replace
+            the socket
+    """
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    # In a shared sticky directory such as /tmp others cannot replace the
+    # socket once it exists, and clients check who owns it
+    stat = os.stat(directory)
+    if stat.st_uid != os.getuid() and not stat.st_mode & 0o1000:
+        raise DaemonRefused(
+            f"Refusing to use {directory}: it belongs to another user"
+        )
+
+
+def start(
+    path: Optional[str] = None,
+    backend: str = "openai",
+    log_path: Optional[str] = None,
+    wait: float = 30.0,
+) -> Optional[int]:
+    """
+    Start a daemon in the background and wait until it answers.
+
+    Returns:
+        The daemon's pid, or None if one was already running
+    """
+
+    path = path or default_socket_path()
+    if request({"command": "ping"}, path) is not None:
+        return None
+
+    _private_directory(path)
+    log_path = log_path or path + ".log"
+    with open(log_path, "a", encoding="utf-8") as log:
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "prompt_os",
+                "daemon",
+                "run",
+                "--socket",
+                path,
+                "--backend",
+                backend,
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise DaemonError(f"Daemon exited during startup, see {log_path}")
+        if request({"command": "ping"}, path) is not None:
+            return process.pid
+        time.sleep(0.1)
+    raise DaemonError(f"Daemon did not start within {wait:g} seconds, see {log_path}")
+
+
+class _ResultCache:
+    """Thread-safe LRU cache of grading results"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, result: dict) -> None:
+        with self.lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def reply(self, message: dict) -> None:
+        self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+
+        try:
+            message = json.loads(line)
+            command = message.get("command")
+            if command == "ping":
+                self.reply(self.server.status())
+            elif command == "shutdown":
+                self.reply({"event": "stopping"})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            elif command == "grade":
+                self.grade(message)
+            else:
+                self.reply(
+                    {
+                        "event": "error",
+                        "type": "ValueError",
+                        "message": f"Unknown command: {command}",
+                    }
+                )
+        except BrokenPipeError:
+            # The client went away, e.g. Ctrl+C during a grading
+            pass
+        except Exception as e:
+            self.reply(
+                {"event": "error", "type": type(e).__name__, "message": str(e)}
+            )
+
+    def grade(self, message: dict) -> None:
+        from .criteria import criterion_labels, get_criteria
+        from .prompt_grader import grade_prompt
+
+        # Never pass off fake grades, or grades billed to another key, as
+        # the caller's own
+        backend = message.get("backend")
+        if backend is not None and backend != self.server.backend:
+            raise DaemonRefused(
+                f"The daemon grades with the {self.server.backend} backend, "
+                f"not {backend}"
+            )
+        if backend == "openai" and message.get("api_key") != self.server.api_key():
+            raise DaemonRefused("The daemon grades with a different OPENAI_API_KEY")
+
+        options = message.get("options", {})
+        criteria = get_criteria(options.get("criteria"))
+        self.reply(
+            {
+                "event": "labels",
+                "labels": criterion_labels(criterion.name for criterion in criteria),
+            }
+        )
+
+        # Sampled gradings are random by design, everything else is repeatable
+        cacheable = (
+            message.get("cache", True)
+            and options.get("samples", 1) <= 1
+            and not options.get("temperature")
+        )
+        key = hashlib.sha256(
+            json.dumps(
+                [message["prompt"], message["model"], options], sort_keys=True
+            ).encode("utf-8")
+        ).hexdigest()
+
+        result = self.server.cache.get(key) if cacheable else None
+        if result is None:
+            on_field = None
+            if message.get("stream"):
+
+                def on_field(name, value):
+                    self.reply({"event": "field", "name": name, "value": value})
+
+            result = grade_prompt(
+                message["prompt"], message["model"], on_field=on_field, **options
+            )
+            if result is not None and cacheable:
+                self.server.cache.put(key, result)
+        elif message.get("stream"):
+            # Replay a cached result as if it had just been generated
+            for name, value in result.items():
+                if isinstance(value, dict) and "score" in value:
+                    for field in ("score", "explanation"):
+                        if value[field] is None:
+                            # Not generated at this detail level
+                            continue
+                        self.reply(
+                            {
+                                "event": "field",
+                                "name": f"{name}_{field}",
+                                "value": value[field],
+                            }
+                        )
+
+        with self.server.lock:
+            self.server.served += 1
+        self.reply({"event": "result", "result": result})
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, backend: str):
+        super().__init__(path, _Handler)
+        self.backend = backend
+        self.cache = _ResultCache(CACHE_SIZE)
+        self.started = time.time()
+        self.served = 0
+        self.lock = threading.Lock()
+
+    def api_key(self) -> Optional[str]:
+        """Fingerprint of the API key the daemon grades with"""
+        return _api_key_fingerprint()
+
+    def status(self) -> dict:
+        return {
+            "event": "status",
+            "pid": os.getpid(),
+            "backend": self.backend,
+            "uptime": time.time() - self.started,
+            "served": self.served,
+            "cache": {
+                "entries": len(self.cache.entries),
+                "hits": self.cache.hits,
+                "misses": self.cache.misses,
+            },
+        }
+
+
+def serve(path: Optional[str] = None, backend: str = "openai") -> None:
+    """
+    Run the daemon in the foreground until it is asked to shut down.
+
+    The grader, its connection pool and a cache of recent results stay loaded
+    for the lifetime of the process. The socket is created in a directory
+    only the current user can access, since the daemon grades with their
+    API key, and clients check who owns it before sending prompts.
+
+    Args:
+        path: Socket to listen on, defaults to default_socket_path()
+        backend: "openai", or "fake" to grade against a local FakeChatModel
+    """
+
+    # Pay for importing LangChain once, before the first request arrives
+    from . import prompt_grader
+
+    if backend == "fake":
+        from .fake_backend import fake_chat_model_factory
+
+        prompt_grader.set_chat_model_factory(fake_chat_model_factory())
+    elif backend != "openai":
+        raise ValueError(f"Unknown backend: {backend}")
+
+    path = path or default_socket_path()
+    _private_directory(path)
+    if request({"command": "ping"}, path) is not None:
+        raise DaemonError(f"A daemon is already listening on {path}")
+    if os.path.exists(path):
+        # Left behind by a daemon that did not shut down cleanly
+        os.unlink(path)
+
+    previous_umask = os.umask(0o177)
+    try:
+        server = _Server(path, backend)
+    finally:
+        os.umask(previous_umask)
+
+    try:
+        print(f"prompt-os daemon {os.getpid()} listening on {path}", flush=True)
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
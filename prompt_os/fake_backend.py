@@ -0,0 +1,180 @@
+"""
+Local stand-in for the OpenAI backend, used for load testing and benchmarks
+"""
+
+import copy
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, List
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+# Words used to pad generated explanations to a realistic length
+_FILLER = (
+    "the prompt would benefit from clearer instructions about the expected "
+    "format audience and scope of the response"
+).split()
+
+
+class FakeChatModel:
+    """
+    Chat model that answers grading tool calls locally with synthetic results.
+
+    Latency is modelled as a fixed overhead plus time per input character and
+    per generated token, and only ``capacity`` requests are served at once, so
+    latency degrades under load the way a rate-limited provider's does.
+
+    Args:
+        model: Model name, only recorded
+        temperature: Sampling temperature; 0 makes scores deterministic per prompt
+        base_latency: Seconds of overhead per request
+        seconds_per_input_char: Time spent reading each input character
+        seconds_per_output_token: Time spent generating each output token
+        explanation_words: Length of each generated explanation, unless the
+            field description asks for at most fewer words
+        capacity: Number of requests served concurrently
+        error_rate: Fraction of requests that fail with a RuntimeError
+    """
+
+    def __init__(
+        self,
+        model: str = "fake",
+        temperature: float = 0,
+        base_latency: float = 0.2,
+        seconds_per_input_char: float = 0.00001,
+        seconds_per_output_token: float = 0.005,
+        explanation_words: int = 40,
+        capacity: int = 16,
+        error_rate: float = 0.0,
+    ):
+        self.model = model
+        self.temperature = temperature
+        self.base_latency = base_latency
+        self.seconds_per_input_char = seconds_per_input_char
+        self.seconds_per_output_token = seconds_per_output_token
+        self.explanation_words = explanation_words
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._slots = threading.Semaphore(capacity)
+        self._tools: List[Any] = []
+
+    def with_settings(self, **settings) -> "FakeChatModel":
+        """Copy of this model sharing its capacity, with some attributes changed"""
+        model = copy.copy(self)
+        for name, value in settings.items():
+            setattr(model, name, value)
+        return model
+
+    def bind_tools(self, tools: List[Any]) -> "FakeChatModel":
+        return self.with_settings(_tools=list(tools))
+
+    def _tool_args(self, text: str, rng: random.Random) -> dict:
+        schema = self._tools[0]
+        args = {}
+        for name, field in schema.model_fields.items():
+            if field.annotation is int:
+                args[name] = rng.randint(1, 10)
+            else:
+                # Follow word limits such as those of brief explanations
+                limit = re.search(r"at most (\d+) words", field.description or "")
+                length = self.explanation_words
+                if limit:
+                    length = min(length, int(limit.group(1)))
+                words = [rng.choice(_FILLER) for _ in range(length)]
+                args[name] = " ".join(words).capitalize() + "."
+        return args
+
+    def _respond(self, messages) -> tuple:
+        if not self._tools:
+            raise ValueError("FakeChatModel only answers tool calls, use bind_tools")
+
+        text = "".join(str(message.content) for message in messages)
+        seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+        rng = random.Random(seed if self.temperature == 0 else None)
+
+        args = json.dumps(self._tool_args(text, rng))
+        # Roughly four characters per token, as for OpenAI tokenizers
+        usage = {
+            "input_tokens": len(text) // 4,
+            "output_tokens": len(args) // 4,
+            "total_tokens": len(text) // 4 + len(args) // 4,
+        }
+        return text, args, usage
+
+    def _maybe_fail(self) -> None:
+        if self.error_rate and random.random() < self.error_rate:
+            raise RuntimeError("Fake backend error")
+
+    def invoke(self, messages) -> AIMessage:
+        text, args, usage = self._respond(messages)
+        with self._slots:
+            time.sleep(
+                self.base_latency
+                + len(text) * self.seconds_per_input_char
+                + usage["output_tokens"] * self.seconds_per_output_token
+            )
+            self._maybe_fail()
+
+        return AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": self._tools[0].__name__,
+                    "args": json.loads(args),
+                    "id": "call_fake",
+                }
+            ],
+            usage_metadata=usage,
+        )
+
+    def stream(self, messages):
+        text, args, usage = self._respond(messages)
+        with self._slots:
+            time.sleep(self.base_latency + len(text) * self.seconds_per_input_char)
+            self._maybe_fail()
+            yield AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {
+                        "name": self._tools[0].__name__,
+                        "args": "",
+                        "id": "call_fake",
+                        "index": 0,
+                    }
+                ],
+            )
+            for start in range(0, len(args), 4):
+                time.sleep(self.seconds_per_output_token)
+                yield AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": None,
+                            "args": args[start : start + 4],
+                            "id": None,
+                            "index": 0,
+                        }
+                    ],
+                )
+            yield AIMessageChunk(content="", usage_metadata=usage)
+
+
+def fake_chat_model_factory(**options):
+    """
+    Build a chat model factory for set_chat_model_factory that serves every
+    request from one shared FakeChatModel backend.
+
+    Args:
+        options: FakeChatModel keyword arguments
+    """
+
+    backend = FakeChatModel(**options)
+
+    def factory(model: str, temperature: float = 0) -> FakeChatModel:
+        return backend.with_settings(model=model, temperature=temperature)
+
+    return factory
@@ -0,0 +1,529 @@
+"""
+Replay recorded grading traffic to measure how much load a deployment sustains
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence
+
+from . import __version__
+
+REPORT_VERSION = 1
+
+# Reports of runs against the fake backend describe its latency and token
+# model, not the API's
+MODELLED_NOTE = (
+    "Latencies and token counts are modelled by the fake backend, not measured;"
+    " use --backend openai for real numbers"
+)
+
+# Words used to build prompts of a recorded size when the text was not kept
+_PROMPT_WORDS = (
+    "write summarise explain the a story report about customer data cat "
+    "python function list essay climate change in exactly words with examples"
+).split()
+
+
+def synthetic_prompt(chars: int) -> str:
+    """Build a prompt of roughly ``chars`` characters"""
+
+    rng = random.Random(chars)
+    words = []
+    length = 0
+    while length < chars:
+        word = rng.choice(_PROMPT_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:chars].capitalize()
+
+
+def load_traffic(path: str) -> List[dict]:
+    """
+    Read recorded grading traffic.
+
+    The file holds one JSON object per line with the arrival time in seconds
+    (``t``, any origin) and either the ``prompt`` text or its size in
+    ``prompt_chars``.
+
+    Returns:
+        Requests sorted by arrival, as {"t": float, "prompt": str} with t
+        relative to the first request
+    """
+
+    traffic = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "t" not in record:
+                raise ValueError(f"{path}:{number}: missing arrival time 't'")
+            if "prompt" in record:
+                prompt = record["prompt"]
+            elif "prompt_chars" in record:
+                prompt = synthetic_prompt(int(record["prompt_chars"]))
+            else:
+                raise ValueError(f"{path}:{number}: needs 'prompt' or 'prompt_chars'")
+            traffic.append({"t": float(record["t"]), "prompt": prompt})
+
+    traffic.sort(key=lambda request: request["t"])
+    if traffic:
+        start = traffic[0]["t"]
+        for request in traffic:
+            request["t"] -= start
+    return traffic
+
+
+def synthetic_traffic(
+    rate: float, duration: float, mean_chars: int = 200, seed: int = 0
+) -> List[dict]:
+    """
+    Generate Poisson arrivals for when no recording is available.
+
+    Args:
+        rate: Mean requests per second
+        duration: Seconds of traffic
+        mean_chars: Mean prompt size, sizes are exponentially distributed
+        seed: Random seed, so runs are comparable between releases
+    """
+
+    rng = random.Random(seed)
+    traffic = []
+    t = 0.0
+    while True:
+        t += rng.expovariate(rate)
+        if t >= duration:
+            return traffic
+        chars = max(10, int(rng.expovariate(1 / mean_chars)))
+        traffic.append({"t": t, "prompt": synthetic_prompt(chars)})
+
+
+def percentile(values: Sequence[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile, None for no values"""
+
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _latency_summary(latencies: Sequence[float]) -> dict:
+    return {
+        "p50": percentile(latencies, 0.50),
+        "p90": percentile(latencies, 0.90),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "max": max(latencies) if latencies else None,
+        "mean": sum(latencies) / len(latencies) if latencies else None,
+    }
+
+
+def replay(
+    traffic: Sequence[dict],
+    grade: Callable[[str], Optional[dict]],
+    speedup: float = 1.0,
+    concurrency: int = 8,
+    window: float = 1.0,
+    sample_interval: float = 0.05,
+) -> dict:
+    """
+    Replay traffic against a grader and measure how it copes.
+
+    Requests are released at their recorded arrival times divided by
+    ``speedup`` and handed to ``concurrency`` workers; requests that arrive
+    while every worker is busy wait in a queue.
+
+    Args:
+        traffic: Requests as returned by load_traffic or synthetic_traffic
+        grade: Grades one prompt, e.g. a wrapper around grade_prompt
+        speedup: Factor by which arrivals are compressed in time
+        concurrency: Number of requests graded at once
+        window: Width in seconds of the timeline buckets
+        sample_interval: Seconds between queue depth samples
+
+    Returns:
+        Report with a "summary" over the whole run and a "timeline" of
+        per-window throughput, latency percentiles, queue depth and errors
+    """
+
+    records = []
+    lock = threading.Lock()
+    state = {"arrived": 0, "started": 0, "finished": 0}
+    depth_samples = []
+    done = threading.Event()
+
+    def run(request, arrived_at):
+        with lock:
+            state["started"] += 1
+        started_at = time.perf_counter()
+        error = None
+        try:
+            if grade(request["prompt"]) is None:
+                error = "No result received from the grading"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finished_at = time.perf_counter()
+        with lock:
+            state["finished"] += 1
+            records.append(
+                {
+                    "arrived": arrived_at,
+                    "started": started_at,
+                    "finished": finished_at,
+                    "prompt_chars": len(request["prompt"]),
+                    "error": error,
+                }
+            )
+
+    def sample_depth():
+        while not done.is_set():
+            with lock:
+                depth_samples.append(
+                    (
+                        time.perf_counter(),
+                        state["arrived"] - state["started"],
+                        state["started"] - state["finished"],
+                    )
+                )
+            done.wait(sample_interval)
+
+    origin = time.perf_counter()
+    sampler = threading.Thread(target=sample_depth, daemon=True)
+    sampler.start()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for request in traffic:
+            delay = origin + request["t"] / speedup - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            arrived_at = time.perf_counter()
+            with lock:
+                state["arrived"] += 1
+            executor.submit(run, request, arrived_at)
+
+    done.set()
+    sampler.join()
+    end = time.perf_counter()
+
+    return {
+        "summary": _summarise(records, depth_samples, end - origin),
+        "timeline": _timeline(records, depth_samples, origin, end, window),
+    }
+
+
+def _summarise(records, depth_samples, duration) -> dict:
+    completed = [record for record in records if record["error"] is None]
+    errors = len(records) - len(completed)
+
+    error_counts = {}
+    for record in records:
+        if record["error"] is not None:
+            error_counts[record["error"]] = error_counts.get(record["error"], 0) + 1
+
+    return {
+        "requests": len(records),
+        "completed": len(completed),
+        "errors": errors,
+        "error_rate": errors / len(records) if records else 0.0,
+        "duration": duration,
+        "throughput": len(completed) / duration if duration else 0.0,
+        "latency": _latency_summary(
+            [record["finished"] - record["arrived"] for record in completed]
+        ),
+        "queue_wait": _latency_summary(
+            [record["started"] - record["arrived"] for record in records]
+        ),
+        "max_queue_depth": max((sample[1] for sample in depth_samples), default=0),
+        "max_in_flight": max((sample[2] for sample in depth_samples), default=0),
+        "error_types": error_counts,
+    }
+
+
+def _timeline(records, depth_samples, origin, end, window) -> List[dict]:
+    buckets = [
+        {"arrived": 0, "finished": [], "errors": 0, "queue_depth": [], "in_flight": []}
+        for _ in range(max(1, math.ceil((end - origin) / window)))
+    ]
+
+    def bucket(t):
+        return buckets[min(len(buckets) - 1, int((t - origin) / window))]
+
+    for record in records:
+        bucket(record["arrived"])["arrived"] += 1
+        finished = bucket(record["finished"])
+        if record["error"] is None:
+            finished["finished"].append(record["finished"] - record["arrived"])
+        else:
+            finished["errors"] += 1
+    for t, queue_depth, in_flight in depth_samples:
+        bucket(t)["queue_depth"].append(queue_depth)
+        bucket(t)["in_flight"].append(in_flight)
+
+    timeline = []
+    for index, entry in enumerate(buckets):
+        finished = len(entry["finished"]) + entry["errors"]
+        timeline.append(
+            {
+                "start": index * window,
+                "arrivals": entry["arrived"],
+                "completed": len(entry["finished"]),
+                "errors": entry["errors"],
+                "error_rate": entry["errors"] / finished if finished else 0.0,
+                "throughput": len(entry["finished"]) / window,
+                "latency": _latency_summary(entry["finished"]),
+                "queue_depth": {
+                    "mean": (
+                        sum(entry["queue_depth"]) / len(entry["queue_depth"])
+                        if entry["queue_depth"]
+                        else 0.0
+                    ),
+                    "max": max(entry["queue_depth"], default=0),
+                },
+                "in_flight_max": max(entry["in_flight"], default=0),
+            }
+        )
+    return timeline
+
+
+def run_load_test(
+    traffic: Sequence[dict],
+    model: str = "gpt-5",
+    speedup: float = 1.0,
+    concurrency: int = 8,
+    window: float = 1.0,
+    backend: str = "fake",
+    backend_options: Optional[dict] = None,
+    grade_options: Optional[dict] = None,
+    target: str = "in-process",
+    socket_path: Optional[str] = None,
+) -> dict:
+    """
+    Replay traffic against the grader and return the report.
+
+    Args:
+        traffic: Requests as returned by load_traffic or synthetic_traffic
+        model: Model name passed to the grader
+        speedup: Factor by which arrivals are compressed in time
+        concurrency: Number of requests graded at once
+        window: Width in seconds of the timeline buckets
+        backend: "fake" to grade against a local FakeChatModel, "openai" for the real API
+        backend_options: FakeChatModel keyword arguments
+        grade_options: Extra keyword arguments for grade_prompt, e.g. criteria
+        target: "in-process", or "daemon" to send every request to a running
+            prompt-os daemon, which grades with its own backend
+        socket_path: Daemon socket, defaults to daemon.default_socket_path()
+
+    Returns:
+        Report (see replay) with the run configuration under "config"
+    """
+
+    grade_options = grade_options or {}
+
+    if target == "daemon":
+        from . import daemon
+
+        status = daemon.request({"command": "ping"}, socket_path)
+        if status is None:
+            raise ValueError(
+                "No prompt-os daemon is running, start one with: prompt-os daemon start"
+            )
+
+        def grade(prompt):
+            # Bypass the daemon's result cache, which would answer the
+            # repeated prompts of recorded and synthetic traffic for free
+            forwarded = daemon.try_grade(
+                prompt,
+                model,
+                grade_options,
+                path=socket_path,
+                backend=None,
+                use_cache=False,
+            )
+            if forwarded is None:
+                raise daemon.DaemonError("Daemon stopped during the run")
+            return forwarded[0]
+
+        report = replay(traffic, grade, speedup, concurrency, window)
+        backend, backend_options = f"daemon ({status['backend']})", {}
+    elif target == "in-process":
+        report = _run_in_process(
+            traffic,
+            model,
+            speedup,
+            concurrency,
+            window,
+            backend,
+            backend_options,
+            grade_options,
+        )
+    else:
+        raise ValueError(f"Unknown target: {target}")
+
+    config = _run_config(
+        traffic,
+        model,
+        speedup,
+        concurrency,
+        window,
+        target,
+        backend,
+        backend_options,
+        grade_options,
+    )
+    return {"config": config, **report}
+
+
+def _run_config(
+    traffic,
+    model,
+    speedup,
+    concurrency,
+    window,
+    target,
+    backend,
+    backend_options,
+    grade_options,
+) -> dict:
+    modelled = backend in ("fake", "daemon (fake)")
+    config = {
+        "report_version": REPORT_VERSION,
+        "prompt_os_version": __version__,
+        "target": target,
+        "backend": backend,
+        "modelled": modelled,
+        "backend_options": backend_options or {},
+        "model": model,
+        "grade_options": grade_options,
+        "requests": len(traffic),
+        "speedup": speedup,
+        "concurrency": concurrency,
+        "window": window,
+    }
+    if modelled:
+        config["note"] = MODELLED_NOTE
+    return config
+
+
+def _run_in_process(
+    traffic,
+    model,
+    speedup,
+    concurrency,
+    window,
+    backend,
+    backend_options,
+    grade_options,
+) -> dict:
+    from .prompt_grader import grade_prompt, set_chat_model_factory
+    from .usage import token_usage
+
+    def grade(prompt):
+        return grade_prompt(prompt, model, **grade_options)
+
+    previous = None
+    if backend == "fake":
+        from .fake_backend import fake_chat_model_factory
+
+        previous = set_chat_model_factory(
+            fake_chat_model_factory(**(backend_options or {}))
+        )
+    elif backend != "openai":
+        raise ValueError(f"Unknown backend: {backend}")
+
+    token_usage.reset()
+    try:
+        report = replay(traffic, grade, speedup, concurrency, window)
+    finally:
+        if previous is not None:
+            set_chat_model_factory(previous)
+
+    report["summary"]["tokens"] = token_usage.summary()
+    return report
+
+
+def compare_detail_levels(
+    traffic: Sequence[dict],
+    model: str = "gpt-5",
+    speedup: float = 1.0,
+    concurrency: int = 8,
+    window: float = 1.0,
+    backend: str = "fake",
+    backend_options: Optional[dict] = None,
+    grade_options: Optional[dict] = None,
+) -> dict:
+    """
+    Replay the same traffic in-process at every detail level.
+
+    Returns:
+        Report with the run configuration under "config" and, for each level
+        in DETAIL_LEVELS, the latency, throughput and token usage of its run
+        and its "reduction" relative to the "full" level (the fraction of
+        mean latency, p95 latency and output tokens saved). With the fake
+        backend the figures are modelled, not measured, and "config" says so.
+    """
+
+    from .criteria import DETAIL_LEVELS
+
+    grade_options = {
+        name: value
+        for name, value in (grade_options or {}).items()
+        if name != "detail"
+    }
+
+    levels = {}
+    for detail in DETAIL_LEVELS:
+        report = run_load_test(
+            traffic,
+            model,
+            speedup,
+            concurrency,
+            window,
+            backend,
+            backend_options,
+            {**grade_options, "detail": detail},
+        )
+        summary = report["summary"]
+        usage = summary["tokens"].get(detail, {})
+        levels[detail] = {
+            "completed": summary["completed"],
+            "errors": summary["errors"],
+            "throughput": summary["throughput"],
+            "latency": summary["latency"],
+            "input_tokens": usage.get("input_tokens", 0),
+            "output_tokens": usage.get("output_tokens", 0),
+            "output_tokens_per_request": usage.get("output_tokens_per_request", 0.0),
+        }
+
+    def saved(level, baseline):
+        if not baseline or level is None:
+            return None
+        return 1 - level / baseline
+
+    full = levels["full"]
+    for level in levels.values():
+        level["reduction"] = {
+            "latency_mean": saved(level["latency"]["mean"], full["latency"]["mean"]),
+            "latency_p95": saved(level["latency"]["p95"], full["latency"]["p95"]),
+            "output_tokens": saved(
+                level["output_tokens_per_request"], full["output_tokens_per_request"]
+            ),
+        }
+
+    config = _run_config(
+        traffic,
+        model,
+        speedup,
+        concurrency,
+        window,
+        "in-process",
+        backend,
+        backend_options,
+        grade_options,
+    )
+    return {"config": config, "levels": levels}
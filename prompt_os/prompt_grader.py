@@ -3,13 +3,39 @@ Prompt improvement functionality using LangChain
 """
 
 import os
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage
 import json
 from pydantic import BaseModel, Field
 
+from .criteria import (
+    DEFAULT_CRITERIA,
+    DEFAULT_DETAIL,
+    check_detail,
+    combined_instructions,
+    combined_schema,
+    get_criteria,
+)
+from .sampling import DEFAULT_SAMPLING_TEMPERATURE, sample_until_consistent
+from .streaming import PartialArgsParser
+from .usage import token_usage
+
 # Load environment variables
 load_dotenv()
 
@@ -56,99 +82,322 @@ class GradingResult(BaseModel):
     )
 
 
-def calculate_overall_score(result: GradingResult) -> int:
-    """Calculate the overall score based on the scores of the individual categories"""
+def calculate_overall_score(result: Union[BaseModel, Mapping[str, int]]) -> int:
+    """
+    Calculate the overall score based on the scores of the individual categories.
+
+    Args:
+        result: A grading schema instance, whose `*_score` fields are used, or
+            a mapping of criterion name to score. Only the criteria present
+            are aggregated.
+    """
 
     try:
-        # Take the reverse as we want low values to indicate a poor prompt
-        ambiguity_score = result.ambiguity_score
-        contradictions_score = result.contradictions_score
-        context_score = result.context_score
-        grammar_score = result.grammar_score
+        if isinstance(result, BaseModel):
+            scores = [
+                value
+                for name, value in result.model_dump().items()
+                if name.endswith("_score")
+            ]
+        else:
+            scores = list(result.values())
 
         # Reverse the scores: high = good, low = bad, with 1 as the worst possible score
         # Subtract from 11 so that a score of 10 (worst) becomes 1, and a score of 1 (best) becomes 10
-        reversed_ambiguity = 11 - ambiguity_score
-        reversed_contradictions = 11 - contradictions_score
-        reversed_context = 11 - context_score
-        reversed_grammar = 11 - grammar_score
-
-        return int(
-            (
-                reversed_ambiguity
-                + reversed_contradictions
-                + reversed_context
-                + reversed_grammar
-            )
-            // 4
-        )
+        reversed_scores = [11 - score for score in scores]
+
+        return int(sum(reversed_scores) // len(reversed_scores))
     except:
         print("Error calculating overall score")
         return 0
 
 
-def grade_prompt(prompt: str, model: str = "gpt-5") -> Optional[dict]:
+def openai_chat_model(model: str, temperature: float = 0):
+    """Create the OpenAI chat model used for grading"""
+
+    if not os.getenv("OPENAI_API_KEY"):
+        raise ValueError("OPENAI_API_KEY environment variable is required")
+
+    return _cached_openai_chat_model(model, temperature, os.getenv("OPENAI_API_KEY"))
+
+
+@lru_cache(maxsize=32)
+def _cached_openai_chat_model(model: str, temperature: float, api_key: str):
+    # Reusing the client keeps its HTTP connection pool open between gradings.
+    # stream_usage makes streamed responses report token usage too
+    return ChatOpenAI(
+        model=model, temperature=temperature, api_key=api_key, stream_usage=True
+    )
+
+
+# Creates the chat model for each grading request, see set_chat_model_factory
+_chat_model_factory: Callable[[str, float], Any] = openai_chat_model
+
+
+def set_chat_model_factory(
+    factory: Optional[Callable[[str, float], Any]] = None,
+) -> Callable[[str, float], Any]:
     """
-    Grade a prompt based on ambiguity, contradictions, and context.
+    Replace the function that creates chat models, e.g. with a local fake backend.
 
     Args:
-        prompt: The prompt to grade
-        model: OpenAI model to use
+        factory: Called with (model, temperature); must return a LangChain chat
+            model supporting bind_tools. None restores the OpenAI backend.
 
     Returns:
-        Dictionary with grading results including scores and explanations
+        The previous factory
     """
 
-    if not os.getenv("OPENAI_API_KEY"):
-        raise ValueError("OPENAI_API_KEY environment variable is required")
+    global _chat_model_factory
+    previous = _chat_model_factory
+    _chat_model_factory = factory or openai_chat_model
+    return previous
 
-    llm = ChatOpenAI(
-        model=model, temperature=0, api_key=os.getenv("OPENAI_API_KEY")
-    ).bind_tools([GradingResult])
 
-    # Read system prompt from file
-    prompt_file = "prompt_os/prompts/prompt_grader.txt"
-    try:
-        with open(prompt_file, "r", encoding="utf-8") as f:
-            system_prompt = f.read().strip()
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Prompt file not found: {prompt_file}")
+def create_chat_model(model: str, temperature: float = 0):
+    """Create a chat model for grading from the current factory"""
+    return _chat_model_factory(model, temperature)
+
+
+def _stream_response(llm, messages, on_field: Callable[[str, Any], None]):
+    """
+    Stream a tool-calling response, reporting each argument as soon as it is complete.
+
+    Returns:
+        The full response message, equivalent to what ``llm.invoke`` would return
+    """
+
+    parser = PartialArgsParser()
+    response = None
+    for chunk in llm.stream(messages):
+        response = chunk if response is None else response + chunk
+        for tool_call_chunk in chunk.tool_call_chunks:
+            # Only the first tool call is used, see grade_prompt
+            if tool_call_chunk.get("index", 0) not in (0, None):
+                continue
+            if tool_call_chunk.get("args"):
+                for name, value in parser.feed(tool_call_chunk["args"]):
+                    on_field(name, value)
+    return response
+
+
+def _grade_call(
+    prompt: str,
+    model: str,
+    instructions: str,
+    schema: Type[BaseModel],
+    on_field: Optional[Callable[[str, Any], None]] = None,
+    temperature: float = 0,
+    detail: str = DEFAULT_DETAIL,
+) -> Optional[BaseModel]:
+    """Make one grading request and validate the tool call against the schema"""
+
+    llm = create_chat_model(model, temperature).bind_tools([schema])
 
     # Create the grading message
-    messages = [HumanMessage(content=f"{system_prompt}\n\nPrompt to grade: {prompt}")]
+    messages = [HumanMessage(content=f"{instructions}\n\nPrompt to grade: {prompt}")]
+
+    if on_field is not None:
+        response = _stream_response(llm, messages, on_field)
+    else:
+        response = llm.invoke(messages)
 
-    response = llm.invoke(messages)
+    token_usage.record(detail, getattr(response, "usage_metadata", None))
 
     # Extract the tool call result
-    if response.tool_calls:
+    if response is not None and response.tool_calls:
         tool_call = response.tool_calls[0]
-        grading_result = GradingResult.model_validate_json(
-            json.dumps(tool_call["args"])
-        )
+        return schema.model_validate_json(json.dumps(tool_call["args"]))
+    return None
 
-        result = {
-            "ambiguity": {
-                "score": grading_result.ambiguity_score,
-                "explanation": grading_result.ambiguity_explanation,
-            },
-            "contradictions": {
-                "score": grading_result.contradictions_score,
-                "explanation": grading_result.contradictions_explanation,
-            },
-            "context": {
-                "score": grading_result.context_score,
-                "explanation": grading_result.context_explanation,
-            },
-            "grammar": {
-                "score": grading_result.grammar_score,
-                "explanation": grading_result.grammar_explanation,
-            },
-            "overall_score": calculate_overall_score(grading_result),
-            "overall_assessment": grading_result.overall_assessment,
+
+def grade_prompt(
+    prompt: str,
+    model: str = "gpt-5",
+    on_field: Optional[Callable[[str, Any], None]] = None,
+    criteria: Optional[Sequence[str]] = None,
+    parallel: bool = False,
+    samples: int = 1,
+    tolerance: int = 1,
+    temperature: Optional[float] = None,
+    detail: str = DEFAULT_DETAIL,
+) -> Optional[dict]:
+    """
+    Grade a prompt based on ambiguity, contradictions, and context.
+
+    Args:
+        prompt: The prompt to grade
+        model: OpenAI model to use
+        on_field: If given, the response is streamed and this is called with
+            (field name, value) for each GradingResult field as soon as it has
+            been generated, e.g. ("ambiguity_score", 7). Values are unvalidated;
+            the returned result is still validated against GradingResult.
+        criteria: Names of the registered criteria to grade, defaults to
+            ambiguity, contradictions, context and grammar
+        parallel: Grade each criterion in its own concurrent request instead
+            of all of them in one. Lowers latency, but no overall assessment
+            is generated.
+        samples: Maximum number of gradings to draw for self-consistency.
+            Gradings are drawn concurrently and sampling stops early once
+            every criterion's scores agree within ``tolerance``.
+        tolerance: Largest spread between sampled scores that counts as agreement
+        temperature: Sampling temperature, defaults to 0 for a single grading
+            and DEFAULT_SAMPLING_TEMPERATURE when sampling
+        detail: How much the model writes: "full" explanations, "brief"
+            one-sentence ones, or "scores-only". Lower levels generate far
+            fewer tokens and return sooner.
+
+    Returns:
+        Dictionary with grading results including scores and explanations,
+        keyed by criterion name. When sampling, each criterion also has the
+        mean, variance, 95% confidence interval and individual scores of the
+        samples, and a "sampling" entry records how many samples were drawn.
+        The "detail" entry records the detail level; explanations and the
+        overall assessment that were not requested are None.
+    """
+
+    selected = get_criteria(criteria)
+    check_detail(detail)
+
+    if samples > 1:
+        if on_field is not None:
+            raise ValueError("Streaming is not supported when sampling")
+
+        if temperature is None:
+            temperature = DEFAULT_SAMPLING_TEMPERATURE
+        names = [criterion.name for criterion in selected]
+
+        def grade_once():
+            return grade_prompt(
+                prompt,
+                model,
+                criteria=names,
+                parallel=parallel,
+                temperature=temperature,
+                detail=detail,
+            )
+
+        result = sample_until_consistent(grade_once, names, samples, tolerance)
+        if result is None:
+            return None
+
+        return {
+            **{name: result[name] for name in names},
+            "overall_score": calculate_overall_score(
+                {name: result[name]["score"] for name in names}
+            ),
+            "overall_assessment": result["overall_assessment"],
             "original_prompt": prompt,
+            "detail": detail,
+            "sampling": result["sampling"],
         }
 
-        # Log the prompt and grading summary
-        return result
+    temperature = temperature or 0
+
+    if parallel and len(selected) > 1:
+        if on_field is not None:
+            # Fields arrive from several worker threads
+            lock = threading.Lock()
+            report = on_field
+
+            def on_field(name, value):
+                with lock:
+                    report(name, value)
+
+        with ThreadPoolExecutor(max_workers=len(selected)) as executor:
+            futures = [
+                executor.submit(
+                    _grade_call,
+                    prompt,
+                    model,
+                    criterion.grading_instructions(detail),
+                    criterion.detail_schema(detail),
+                    on_field,
+                    temperature,
+                    detail,
+                )
+                for criterion in selected
+            ]
+            gradings = [future.result() for future in futures]
+
+        if any(grading is None for grading in gradings):
+            return None
+        overall_assessment = None
     else:
-        return None
+        if (
+            tuple(criterion.name for criterion in selected) == DEFAULT_CRITERIA
+            and detail == "full"
+        ):
+            schema = GradingResult
+        else:
+            schema = combined_schema(selected, detail)
+
+        grading = _grade_call(
+            prompt,
+            model,
+            combined_instructions(selected, detail),
+            schema,
+            on_field,
+            temperature,
+            detail,
+        )
+        if grading is None:
+            return None
+        gradings = [grading] * len(selected)
+        overall_assessment = getattr(grading, "overall_assessment", None)
+
+    result = {
+        criterion.name: {
+            "score": getattr(grading, f"{criterion.name}_score"),
+            # None when the detail level does not ask for explanations
+            "explanation": getattr(grading, f"{criterion.name}_explanation", None),
+        }
+        for criterion, grading in zip(selected, gradings)
+    }
+    result["overall_score"] = calculate_overall_score(
+        {criterion.name: result[criterion.name]["score"] for criterion in selected}
+    )
+    result["overall_assessment"] = overall_assessment
+    result["original_prompt"] = prompt
+    result["detail"] = detail
+
+    return result
+
+
+def grade_prompts(
+    prompts: Iterable[str],
+    model: str = "gpt-5",
+    max_workers: int = 4,
+    grade_options: Optional[dict] = None,
+) -> Iterator[Tuple[int, Optional[dict], Optional[Exception]]]:
+    """
+    Grade several prompts concurrently.
+
+    Args:
+        prompts: The prompts to grade
+        model: OpenAI model to use
+        max_workers: Maximum number of grading requests in flight
+        grade_options: Extra keyword arguments for grade_prompt, e.g. criteria
+
+    Yields:
+        (index, result, error) tuples in completion order, where index is the
+        position of the prompt in ``prompts``. Exactly one of result and error
+        is set unless the model returned no tool call, in which case both are None.
+    """
+
+    prompts = list(prompts)
+    if not prompts:
+        return
+
+    grade_options = grade_options or {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(grade_prompt, prompt, model, **grade_options): index
+            for index, prompt in enumerate(prompts)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                yield index, future.result(), None
+            except Exception as e:
+                yield index, None, e
@@ -0,0 +1,26 @@
+"""
+Instruction files used by the grader
+"""
+
+import os
+
+PROMPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Instruction file the grader sends ahead of every prompt
+GRADER_PROMPT_FILE = "prompt_grader.txt"
+
+
+def prompt_path(name: str) -> str:
+    """Return the absolute path of an instruction file shipped with the package"""
+    return os.path.join(PROMPTS_DIR, name)
+
+
+def load_prompt(name: str) -> str:
+    """Read an instruction file shipped with the package"""
+
+    path = prompt_path(name)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Prompt file not found: {path}")
@@ -0,0 +1,203 @@
+"""
+Self-consistency sampling of gradings with adaptive early stopping
+"""
+
+import math
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence
+
+# Temperature used for samples when the caller does not choose one
+DEFAULT_SAMPLING_TEMPERATURE = 0.7
+
+# Samples drawn concurrently before agreement is first checked
+MIN_SAMPLES = 2
+
+# z value for the 95% confidence interval of the mean score
+_Z_95 = 1.96
+
+
+class SamplingStats:
+    """Running totals of how many samples gradings needed"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.gradings = 0
+            self.samples = 0
+            self.budget = 0
+            self.early_stops = 0
+
+    def record(self, samples_used: int, max_samples: int, agreed: bool) -> None:
+        with self._lock:
+            self.gradings += 1
+            self.samples += samples_used
+            self.budget += max_samples
+            if agreed and samples_used < max_samples:
+                self.early_stops += 1
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            Dictionary with the number of sampled gradings, the samples drawn,
+            the average samples per grading and the fraction of the sample
+            budget saved by stopping early
+        """
+
+        with self._lock:
+            return {
+                "gradings": self.gradings,
+                "samples": self.samples,
+                "average_samples": (
+                    self.samples / self.gradings if self.gradings else 0.0
+                ),
+                "early_stops": self.early_stops,
+                "samples_saved": (
+                    1 - self.samples / self.budget if self.budget else 0.0
+                ),
+            }
+
+
+sampling_stats = SamplingStats()
+
+
+def get_sampling_stats() -> dict:
+    """Summary of every self-consistency grading made in this process"""
+    return sampling_stats.summary()
+
+
+def scores_agree(
+    samples: Sequence[dict], criteria: Sequence[str], tolerance: int
+) -> bool:
+    """True when every criterion's scores are within ``tolerance`` of each other"""
+
+    for name in criteria:
+        scores = [sample[name]["score"] for sample in samples]
+        if max(scores) - min(scores) > tolerance:
+            return False
+    return True
+
+
+def _criterion_summary(samples: Sequence[dict], name: str) -> dict:
+    scores = [sample[name]["score"] for sample in samples]
+    score = statistics.median_low(scores)
+    mean = statistics.fmean(scores)
+
+    # Sample variance, consistent with the standard error of the interval
+    if len(scores) > 1:
+        variance = statistics.variance(scores)
+    else:
+        variance = 0.0
+    margin = _Z_95 * math.sqrt(variance / len(scores))
+
+    return {
+        "score": score,
+        # Explanation from a sample that gave the aggregated score
+        "explanation": next(
+            sample[name]["explanation"]
+            for sample in samples
+            if sample[name]["score"] == score
+        ),
+        "mean": mean,
+        "variance": variance,
+        "confidence_interval": [mean - margin, mean + margin],
+        "samples": scores,
+    }
+
+
+def aggregate_samples(samples: Sequence[dict], criteria: Sequence[str]) -> dict:
+    """
+    Combine several gradings of the same prompt.
+
+    Each criterion's score is the median of the sampled scores, reported with
+    the mean, sample variance and a 95% confidence interval of the mean. The overall
+    assessment is taken from the sample closest to the aggregated scores.
+    """
+
+    result = {name: _criterion_summary(samples, name) for name in criteria}
+
+    representative = min(
+        samples,
+        key=lambda sample: sum(
+            abs(sample[name]["score"] - result[name]["score"]) for name in criteria
+        ),
+    )
+    result["overall_assessment"] = representative["overall_assessment"]
+    return result
+
+
+def sample_until_consistent(
+    grade_once: Callable[[], Optional[dict]],
+    criteria: Sequence[str],
+    max_samples: int,
+    tolerance: int = 1,
+) -> Optional[dict]:
+    """
+    Draw gradings concurrently until their scores agree.
+
+    Samples are drawn in concurrent waves of ``MIN_SAMPLES``. After each wave
+    the scores of every criterion are compared, and sampling stops as soon as
+    they all agree within ``tolerance`` or ``max_samples`` have been drawn.
+    A sample that raises counts as drawn but is otherwise ignored, so one
+    transient error does not discard the other samples.
+
+    Args:
+        grade_once: Makes one grading, returning a grade_prompt result or None
+        criteria: Names of the graded criteria
+        max_samples: Upper bound on the number of gradings
+        tolerance: Largest allowed spread between the scores of a criterion
+
+    Returns:
+        Aggregated result (see aggregate_samples) without the overall score,
+        with a "sampling" entry describing the samples drawn, or None if no
+        sample returned a result
+
+    Raises:
+        Exception: The last error, if every sample raised
+    """
+
+    samples: List[dict] = []
+    errors: List[Exception] = []
+    drawn = 0
+    agreed = False
+
+    with ThreadPoolExecutor(max_workers=min(MIN_SAMPLES, max_samples)) as executor:
+        while drawn < max_samples:
+            wave = min(MIN_SAMPLES, max_samples - drawn)
+            futures = [executor.submit(grade_once) for _ in range(wave)]
+            drawn += wave
+            for future in futures:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                if result:
+                    samples.append(result)
+
+            if len(samples) >= MIN_SAMPLES and scores_agree(
+                samples, criteria, tolerance
+            ):
+                agreed = True
+                break
+
+    sampling_stats.record(drawn, max_samples, agreed)
+
+    if not samples:
+        if errors and len(errors) == drawn:
+            raise errors[-1]
+        return None
+
+    result = aggregate_samples(samples, criteria)
+    result["sampling"] = {
+        "samples_used": drawn,
+        "max_samples": max_samples,
+        "tolerance": tolerance,
+        "agreed": agreed,
+        "errors": len(errors),
+    }
+    return result
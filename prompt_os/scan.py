@@ -0,0 +1,302 @@
+"""
+Extract and grade the prompts embedded in a source tree
+"""
+
+import ast
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+# Directories that never contain first-party prompts
+SKIP_DIRS = {
+    "__pycache__",
+    "node_modules",
+    "site-packages",
+    "venv",
+    "env",
+    "build",
+    "dist",
+}
+
+# Calls that only ever take prompts
+PROMPT_CALLS = {
+    "grade_prompt",
+    "from_template",
+    "from_messages",
+    "PromptTemplate",
+    "ChatPromptTemplate",
+}
+
+# Message constructors, whose text is positional or ``content``
+MESSAGE_CALLS = {"HumanMessage", "SystemMessage", "AIMessage", "ChatMessage"}
+
+# Method names shared with unrelated APIs (``User.objects.create``), only
+# counted when the receiver looks like an LLM client, e.g. ``self.llm.invoke``
+GENERIC_LLM_CALLS = {
+    "invoke",
+    "ainvoke",
+    "stream",
+    "astream",
+    "batch",
+    "abatch",
+    "predict",
+    "generate",
+    "agenerate",
+    "complete",
+    "create",
+    "acreate",
+}
+LLM_RECEIVER = re.compile(
+    r"(^|[._])(llm|chat|chain|agent|model|client|openai|anthropic"
+    r"|completions?|messages|responses)s?($|[._])"
+)
+
+# Keyword arguments, dict keys and variable names that hold prompt text,
+# matched as whole words of the snake_case name: ``system_prompt`` but not
+# ``content_type`` or ``FILESYSTEM_ROOT``
+PROMPT_NAME = re.compile(
+    r"(^|_)(prompt|instructions?|template|system|system_message)s?($|_)"
+)
+
+# Directory names whose text files are prompt templates
+TEMPLATE_DIRS = {"prompt", "prompts"}
+TEMPLATE_EXTENSIONS = (".txt", ".md")
+MIN_PROMPT_LENGTH = 20
+
+
+def _string_value(node: ast.AST) -> Optional[str]:
+    """Return the text of a string literal, rendering f-string fields as {expr}"""
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                parts.append(str(value.value))
+            else:
+                parts.append("{" + ast.unparse(value.value) + "}")
+        return "".join(parts)
+    return None
+
+
+def _call_name(node: ast.Call) -> str:
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+    return ""
+
+
+def _target_name(node: ast.AST) -> str:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return ""
+
+
+def _snake_case(name: str) -> str:
+    return re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", name).lower()
+
+
+def _is_prompt_name(name: Optional[str]) -> bool:
+    return bool(name) and PROMPT_NAME.search(_snake_case(name)) is not None
+
+
+def _is_llm_receiver(node: ast.Call) -> bool:
+    if not isinstance(node.func, ast.Attribute):
+        return False
+    return LLM_RECEIVER.search(_snake_case(ast.unparse(node.func.value))) is not None
+
+
+def extract_python_prompts(source: str) -> List[Tuple[str, int]]:
+    """
+    Find candidate prompts in Python source.
+
+    Picks up string literals passed to LLM client calls and message
+    constructors, prompt-named keyword arguments, dict values and variables,
+    and the ``content`` of message dicts (those with a ``role``). Literals
+    without whitespace, such as file names and paths, are never prompts.
+
+    Returns:
+        (prompt, line) pairs
+    """
+
+    tree = ast.parse(source)
+    found = []
+
+    def add(node: ast.AST) -> None:
+        text = _string_value(node)
+        if text is None:
+            return
+        text = text.strip()
+        if len(text) >= MIN_PROMPT_LENGTH and re.search(r"\s", text):
+            found.append((text, node.lineno))
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            name = _call_name(node)
+            is_message = name in MESSAGE_CALLS
+            if (
+                is_message
+                or name in PROMPT_CALLS
+                or (name in GENERIC_LLM_CALLS and _is_llm_receiver(node))
+            ):
+                for arg in node.args:
+                    add(arg)
+            for keyword in node.keywords:
+                if _is_prompt_name(keyword.arg) or (
+                    is_message and keyword.arg == "content"
+                ):
+                    add(keyword.value)
+        elif isinstance(node, ast.Dict):
+            keys = {
+                key.value: value
+                for key, value in zip(node.keys, node.values)
+                if isinstance(key, ast.Constant) and isinstance(key.value, str)
+            }
+            for key, value in keys.items():
+                if _is_prompt_name(key) or (key == "content" and "role" in keys):
+                    add(value)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            if node.value is not None and any(
+                _is_prompt_name(_target_name(target)) for target in targets
+            ):
+                add(node.value)
+
+    # A literal can match more than one rule, e.g. content="..." in HumanMessage
+    return sorted(set(found), key=lambda item: item[1])
+
+
+def _extract_file(path: str) -> List[Tuple[str, int]]:
+    """Extract candidate prompts from one file, ignoring files that cannot be read"""
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError):
+        return []
+
+    if path.endswith(".py"):
+        try:
+            return extract_python_prompts(source)
+        except (SyntaxError, ValueError):
+            return []
+
+    text = source.strip()
+    return [(text, 1)] if len(text) >= MIN_PROMPT_LENGTH else []
+
+
+def _is_template_file(path: str) -> bool:
+    """
+    Text files count as prompt templates when their name mentions prompts or
+    they are inside a ``prompts`` directory.
+    """
+
+    if not path.endswith(TEMPLATE_EXTENSIONS):
+        return False
+    *directories, name = path.lower().split(os.sep)
+    return "prompt" in name or any(d in TEMPLATE_DIRS for d in directories)
+
+
+def find_source_files(root: str) -> List[str]:
+    """List the Python files and prompt template files under a path"""
+
+    if os.path.isfile(root):
+        return [root]
+
+    # Template paths include the root's own name, so pointing the scan at a
+    # prompts directory finds the same files as scanning its parent
+    base = os.path.dirname(os.path.abspath(root))
+
+    paths = []
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = sorted(
+            d for d in dirs if not d.startswith(".") and d not in SKIP_DIRS
+        )
+        for name in sorted(files):
+            path = os.path.join(directory, name)
+            if name.endswith(".py") or _is_template_file(
+                os.path.relpath(os.path.abspath(path), base)
+            ):
+                paths.append(path)
+    return paths
+
+
+def extract_prompts(root: str, max_workers: Optional[int] = None) -> List[dict]:
+    """
+    Extract and deduplicate the prompts in a source tree.
+
+    Files are parsed in a process pool, one worker per core by default.
+
+    Args:
+        root: File or directory to scan
+        max_workers: Number of parser processes (default: number of cores)
+
+    Returns:
+        List of {"prompt": str, "locations": [{"path": str, "line": int}]}
+        dicts, one per distinct prompt, in order of first appearance
+    """
+
+    paths = find_source_files(root)
+    if not paths:
+        return []
+
+    max_workers = max_workers or os.cpu_count() or 1
+    # Large chunks keep inter-process overhead low on big trees
+    chunksize = max(1, min(256, len(paths) // (max_workers * 4)))
+
+    prompts = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for path, found in zip(
+            paths, executor.map(_extract_file, paths, chunksize=chunksize)
+        ):
+            for text, line in found:
+                entry = prompts.setdefault(text, {"prompt": text, "locations": []})
+                entry["locations"].append({"path": path, "line": line})
+
+    return list(prompts.values())
+
+
+def scan(
+    root: str,
+    model: str = "gpt-5",
+    max_workers: int = 4,
+    parse_workers: Optional[int] = None,
+    on_result: Optional[Callable[[dict, Optional[dict], Optional[Exception]], None]] = None,
+    grade_options: Optional[dict] = None,
+) -> List[dict]:
+    """
+    Extract the prompts in a source tree and grade each distinct prompt once.
+
+    Args:
+        root: File or directory to scan
+        model: OpenAI model to use
+        max_workers: Maximum number of grading requests in flight
+        parse_workers: Number of parser processes (default: number of cores)
+        on_result: Called with (extracted prompt, result, error) as each prompt finishes
+        grade_options: Extra keyword arguments for grade_prompt, e.g. criteria
+
+    Returns:
+        The extracted prompts, each with "result" and "error" keys added
+    """
+
+    from .prompt_grader import create_chat_model, grade_prompts
+
+    extracted = extract_prompts(root, parse_workers)
+    if extracted:
+        # Fail on a missing API key here rather than on, and for, every prompt
+        create_chat_model(model)
+    for index, result, error in grade_prompts(
+        (entry["prompt"] for entry in extracted), model, max_workers, grade_options
+    ):
+        entry = extracted[index]
+        entry["result"] = result
+        entry["error"] = str(error) if error is not None else None
+        if on_result is not None:
+            on_result(entry, result, error)
+
+    return extracted
@@ -0,0 +1,103 @@
+"""
+Incremental parsing of streamed tool-call arguments
+"""
+
+import json
+from typing import Any, List, Tuple
+
+_WHITESPACE = " \t\n\r"
+
+
+class PartialArgsParser:
+    """
+    Parse a JSON object whose text arrives in fragments.
+
+    Tool-call arguments are streamed as arbitrary slices of a JSON object.
+    Each call to :meth:`feed` returns the top-level fields whose values have
+    been received in full since the previous call, so scores and explanations
+    can be shown before the whole object has been generated.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.position = 0
+        self.started = False
+        self.finished = False
+        self._decoder = json.JSONDecoder()
+
+    def _skip_whitespace(self) -> None:
+        while (
+            self.position < len(self.buffer)
+            and self.buffer[self.position] in _WHITESPACE
+        ):
+            self.position += 1
+
+    def _next_field(self):
+        """Consume one complete `"key": value` pair, or return None if more text is needed"""
+
+        position = self.position
+        self._skip_whitespace()
+        if self.position < len(self.buffer) and self.buffer[self.position] == ",":
+            self.position += 1
+            self._skip_whitespace()
+
+        if self.position < len(self.buffer) and self.buffer[self.position] == "}":
+            self.position += 1
+            self.finished = True
+            return None
+
+        try:
+            key, end = self._decoder.raw_decode(self.buffer, self.position)
+            while end < len(self.buffer) and self.buffer[end] in _WHITESPACE:
+                end += 1
+            if end >= len(self.buffer) or self.buffer[end] != ":":
+                raise ValueError("incomplete key")
+            end += 1
+            while end < len(self.buffer) and self.buffer[end] in _WHITESPACE:
+                end += 1
+            value, end = self._decoder.raw_decode(self.buffer, end)
+        except ValueError:
+            self.position = position
+            return None
+
+        # A number is only complete once the delimiter after it has arrived:
+        # "1" may become "10", "1500" may become "1500.5" or "1500e3"
+        if not isinstance(value, (str, dict, list)):
+            delimiter = end
+            while (
+                delimiter < len(self.buffer)
+                and self.buffer[delimiter] in _WHITESPACE
+            ):
+                delimiter += 1
+            if delimiter >= len(self.buffer) or self.buffer[delimiter] not in ",}":
+                self.position = position
+                return None
+
+        self.position = end
+        return key, value
+
+    def feed(self, fragment: str) -> List[Tuple[str, Any]]:
+        """
+        Add the next fragment of argument text.
+
+        Returns:
+            (field name, value) pairs completed by this fragment
+        """
+
+        self.buffer += fragment
+        if not self.started:
+            self._skip_whitespace()
+            if self.position >= len(self.buffer):
+                return []
+            if self.buffer[self.position] != "{":
+                raise ValueError("Tool-call arguments must be a JSON object")
+            self.position += 1
+            self.started = True
+
+        fields = []
+        while not self.finished:
+            field = self._next_field()
+            if field is None:
+                break
+            fields.append(field)
+        return fields
@@ -0,0 +1,66 @@
+"""
+Token usage of grading requests, per detail level
+"""
+
+import threading
+from typing import Mapping, Optional
+
+_FIELDS = ("input_tokens", "output_tokens", "total_tokens")
+
+
+class UsageStats:
+    """Running token totals of grading requests, grouped by detail level"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.levels = {}
+
+    def record(self, detail: str, usage: Optional[Mapping[str, int]]) -> None:
+        """
+        Add one request's usage metadata, as reported by the chat model.
+
+        Requests without usage metadata are not counted, so that they do not
+        drag down the per-request averages.
+        """
+
+        if not usage:
+            return
+        with self._lock:
+            totals = self.levels.setdefault(
+                detail, {"requests": 0, **{field: 0 for field in _FIELDS}}
+            )
+            totals["requests"] += 1
+            for field in _FIELDS:
+                totals[field] += usage.get(field, 0)
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            Dictionary keyed by detail level with the number of requests, the
+            input, output and total tokens, and the output tokens per request
+        """
+
+        with self._lock:
+            return {
+                detail: {
+                    **totals,
+                    "output_tokens_per_request": (
+                        totals["output_tokens"] / totals["requests"]
+                        if totals["requests"]
+                        else 0.0
+                    ),
+                }
+                for detail, totals in self.levels.items()
+            }
+
+
+token_usage = UsageStats()
+
+
+def get_token_usage() -> dict:
+    """Token usage of every grading request made in this process, per detail level"""
+    return token_usage.summary()
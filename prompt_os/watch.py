@@ -0,0 +1,302 @@
+"""
+Incremental grading of a directory of prompt files
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .prompts import PROMPTS_DIR
+
+MANIFEST_NAME = ".prompt-os-manifest.json"
+MANIFEST_VERSION = 1
+DEFAULT_EXTENSIONS = (".txt", ".md", ".prompt")
+
+
+def grader_fingerprint(model: str, grade_options: Optional[dict] = None) -> str:
+    """
+    Fingerprint everything that affects a grade other than the prompt itself.
+
+    Covers the model name, the grading options and every instruction file
+    shipped in the prompts package, so editing ``prompt_grader.txt``
+    invalidates all stored grades.
+    """
+
+    options = json.dumps(grade_options or {}, sort_keys=True, default=str)
+    digest = hashlib.sha256(f"model={model}\noptions={options}\n".encode("utf-8"))
+    for root, dirs, files in os.walk(PROMPTS_DIR):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.endswith(".txt"):
+                continue
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, PROMPTS_DIR).encode("utf-8"))
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def _hash_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def scan_directory(
+    directory: str, extensions: Iterable[str] = DEFAULT_EXTENSIONS
+) -> Dict[str, Tuple[int, int]]:
+    """
+    Stat every prompt file under a directory.
+
+    Hidden files and directories (including the manifest) are skipped.
+
+    Returns:
+        Mapping of path relative to ``directory`` to (mtime_ns, size)
+    """
+
+    extensions = tuple(extensions)
+    found = {}
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(extensions) and entry.is_file():
+                    stat = entry.stat()
+                    rel = os.path.relpath(entry.path, directory)
+                    found[rel] = (stat.st_mtime_ns, stat.st_size)
+    return found
+
+
+class Manifest:
+    """Content hashes and grades of the prompt files in a directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self.fingerprint: Optional[str] = None
+        self.files: Dict[str, dict] = {}
+        self.dirty = False
+
+    def load(self) -> "Manifest":
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self
+
+        if data.get("version") == MANIFEST_VERSION:
+            self.fingerprint = data.get("fingerprint")
+            self.files = data.get("files", {})
+        return self
+
+    def save(self) -> None:
+        data = {
+            "version": MANIFEST_VERSION,
+            "fingerprint": self.fingerprint,
+            "files": self.files,
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def plan(self, snapshot: Dict[str, Tuple[int, int]]) -> List[str]:
+        """
+        Work out which files need grading.
+
+        Files whose mtime and size match the manifest are trusted without
+        being read, including files that could not be read last time. Files
+        that were touched but whose content hash is unchanged only get their
+        stat refreshed. Deleted files are dropped.
+
+        Returns:
+            Relative paths of new or modified files
+        """
+
+        for rel in list(self.files):
+            if rel not in snapshot:
+                del self.files[rel]
+                self.dirty = True
+
+        pending = []
+        for rel, (mtime_ns, size) in snapshot.items():
+            entry = self.files.get(rel)
+            if (
+                entry is not None
+                and entry["mtime_ns"] == mtime_ns
+                and entry["size"] == size
+                and (entry.get("result") is not None or entry.get("error"))
+            ):
+                continue
+
+            try:
+                sha256 = _hash_file(os.path.join(self.directory, rel))
+            except OSError:
+                # Deleted since the scan, the next scan drops it
+                continue
+            if (
+                entry is not None
+                and entry["sha256"] == sha256
+                and entry.get("result") is not None
+            ):
+                entry["mtime_ns"] = mtime_ns
+                entry["size"] = size
+                self.dirty = True
+                continue
+
+            self.files[rel] = {
+                "mtime_ns": mtime_ns,
+                "size": size,
+                "sha256": sha256,
+                "result": None,
+            }
+            pending.append(rel)
+            self.dirty = True
+
+        return sorted(pending)
+
+
+def grade_changed(
+    directory: str,
+    model: str = "gpt-5",
+    extensions: Iterable[str] = DEFAULT_EXTENSIONS,
+    max_workers: int = 4,
+    on_result: Optional[Callable[[str, Optional[dict], Optional[Exception]], None]] = None,
+    grade_options: Optional[dict] = None,
+) -> List[str]:
+    """
+    Grade the new and modified prompt files in a directory.
+
+    Everything is re-graded when the model, the grading options or the
+    grader instructions have changed since the manifest was written. Files
+    that cannot be read are reported to ``on_result`` with the error and
+    skipped.
+
+    Args:
+        directory: Directory containing prompt files
+        model: OpenAI model to use
+        extensions: File extensions treated as prompts
+        max_workers: Maximum number of grading requests in flight
+        on_result: Called with (relative path, result, error) as each file finishes
+        grade_options: Extra keyword arguments for grade_prompt, e.g. criteria
+
+    Returns:
+        Relative paths of the files that were graded
+    """
+
+    manifest = Manifest(directory).load()
+    fingerprint = grader_fingerprint(model, grade_options)
+    if manifest.fingerprint != fingerprint:
+        manifest.fingerprint = fingerprint
+        manifest.files = {}
+        manifest.dirty = True
+
+    snapshot = scan_directory(directory, extensions)
+    pending = manifest.plan(snapshot)
+    if not pending:
+        if manifest.dirty:
+            manifest.save()
+        return []
+
+    # Imported lazily so that no-op runs never pay for loading langchain
+    from .prompt_grader import create_chat_model, grade_prompts
+
+    # Fail on a missing API key here rather than on, and for, every file
+    create_chat_model(model)
+
+    try:
+        readable = []
+        prompts = []
+        for rel in pending:
+            try:
+                with open(os.path.join(directory, rel), "r", encoding="utf-8") as f:
+                    prompts.append(f.read().strip())
+            except (OSError, UnicodeDecodeError) as e:
+                # E.g. deleted since the scan or not UTF-8; retried once it changes
+                manifest.files[rel]["error"] = f"{type(e).__name__}: {e}"
+                if on_result is not None:
+                    on_result(rel, None, e)
+                continue
+            readable.append(rel)
+
+        for index, result, error in grade_prompts(
+            prompts, model, max_workers, grade_options
+        ):
+            rel = readable[index]
+            if result is not None:
+                stored = dict(result)
+                stored.pop("original_prompt", None)
+                manifest.files[rel]["result"] = stored
+            if on_result is not None:
+                on_result(rel, result, error)
+    finally:
+        manifest.save()
+
+    return readable
+
+
+def watch(
+    directory: str,
+    model: str = "gpt-5",
+    extensions: Iterable[str] = DEFAULT_EXTENSIONS,
+    max_workers: int = 4,
+    poll_interval: float = 0.5,
+    debounce: float = 1.0,
+    on_result: Optional[Callable[[str, Optional[dict], Optional[Exception]], None]] = None,
+    grade_options: Optional[dict] = None,
+) -> None:
+    """
+    Keep a directory graded, re-grading files as they change.
+
+    Edits to the prompt files or to the grader instructions are debounced:
+    grading only starts once nothing has changed for ``debounce`` seconds, so
+    a burst of saves triggers a single pass. Runs until interrupted.
+    """
+
+    extensions = tuple(extensions)
+
+    def current_state():
+        return (
+            grader_fingerprint(model, grade_options),
+            scan_directory(directory, extensions),
+        )
+
+    def grade():
+        grade_changed(
+            directory, model, extensions, max_workers, on_result, grade_options
+        )
+
+    last_graded = current_state()
+    grade()
+    last_seen = last_graded
+    last_change = None
+
+    while True:
+        time.sleep(poll_interval)
+        state = current_state()
+        if state != last_seen:
+            last_seen = state
+            last_change = time.monotonic()
+            continue
+
+        if last_change is None or state == last_graded:
+            last_change = None
+            continue
+
+        if time.monotonic() - last_change >= debounce:
+            # Files saved while grading differ from this snapshot and are
+            # picked up by the next pass
+            last_graded = state
+            grade()
+            last_change = None
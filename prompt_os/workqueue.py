@@ -0,0 +1,477 @@
+"""
+Durable work queue for grading large corpora with several worker processes
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+# Seconds a claimed job stays reserved for its worker
+DEFAULT_LEASE = 300.0
+
+# Claims after which a job that keeps failing is given up on
+DEFAULT_MAX_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    prompt TEXT NOT NULL,
+    source TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires);
+CREATE TABLE IF NOT EXISTS results (
+    job_id INTEGER PRIMARY KEY REFERENCES jobs (id),
+    worker_id TEXT NOT NULL,
+    result TEXT NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class WorkQueue:
+    """
+    Grading jobs stored in a SQLite database.
+
+    Workers claim jobs under a lease. A job whose lease expires, because its
+    worker crashed or stalled, can be claimed again by another worker. A
+    result is only recorded while the recording worker still holds the job's
+    lease, and at most once per job, so every job ends up with exactly one
+    result even when it was graded more than once.
+
+    The database uses SQLite's default rollback journal rather than WAL so
+    that it can be shared by workers on several machines through a network
+    filesystem with working POSIX locks.
+
+    Args:
+        path: Database file, created if it does not exist
+        timeout: Seconds to wait for another worker's write lock
+    """
+
+    def __init__(self, path: str, timeout: float = 60.0):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "WorkQueue":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _transaction(self):
+        """Take the write lock up front so that claims never race"""
+        return _Transaction(self.connection)
+
+    def enqueue(self, prompts: Iterable[Tuple[str, Optional[str]]]) -> int:
+        """
+        Add grading jobs.
+
+        Args:
+            prompts: (prompt, source) pairs, where source is an optional label
+                such as the file the prompt came from
+
+        Returns:
+            Number of jobs added
+        """
+
+        now = time.time()
+        with self._transaction():
+            cursor = self.connection.executemany(
+                "INSERT INTO jobs (prompt, source, created_at) VALUES (?, ?, ?)",
+                ((prompt, source, now) for prompt, source in prompts),
+            )
+        return cursor.rowcount
+
+    def register_worker(self, worker_id: str) -> None:
+        now = time.time()
+        with self._transaction():
+            self.connection.execute(
+                "INSERT OR REPLACE INTO workers (id, host, pid, started_at, last_seen)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (worker_id, socket.gethostname(), os.getpid(), now, now),
+            )
+
+    def claim(
+        self,
+        worker_id: str,
+        limit: int = 1,
+        lease: float = DEFAULT_LEASE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> List[dict]:
+        """
+        Lease up to ``limit`` pending jobs, or jobs whose lease has expired.
+
+        Expired jobs that have already been claimed ``max_attempts`` times are
+        marked failed instead, so a prompt that crashes workers is given up on.
+
+        Returns:
+            Claimed jobs as {"id", "prompt", "source", "attempts"} dicts
+        """
+
+        now = time.time()
+        with self._transaction():
+            self.connection.execute(
+                "UPDATE jobs SET status = 'failed', lease_owner = NULL,"
+                " lease_expires = NULL, error = 'Lease expired'"
+                " WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, max_attempts),
+            )
+            rows = self.connection.execute(
+                "SELECT id, prompt, source, attempts FROM jobs"
+                " WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?))"
+                " AND attempts < ? ORDER BY id LIMIT ?",
+                (now, max_attempts, limit),
+            ).fetchall()
+            self.connection.executemany(
+                "UPDATE jobs SET status = 'leased', lease_owner = ?,"
+                " lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                ((worker_id, now + lease, row["id"]) for row in rows),
+            )
+            self.connection.execute(
+                "UPDATE workers SET last_seen = ? WHERE id = ?", (now, worker_id)
+            )
+
+        return [
+            {
+                "id": row["id"],
+                "prompt": row["prompt"],
+                "source": row["source"],
+                "attempts": row["attempts"] + 1,
+            }
+            for row in rows
+        ]
+
+    def renew(
+        self, worker_id: str, job_ids: Iterable[int], lease: float = DEFAULT_LEASE
+    ) -> List[int]:
+        """
+        Extend the leases of jobs that are still being graded.
+
+        Returns:
+            Ids of the jobs the worker still holds; the others have been
+            taken over by another worker or given up on
+        """
+
+        job_ids = list(job_ids)
+        now = time.time()
+        held = []
+        with self._transaction():
+            for job_id in job_ids:
+                cursor = self.connection.execute(
+                    "UPDATE jobs SET lease_expires = ?"
+                    " WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                    (now + lease, job_id, worker_id),
+                )
+                if cursor.rowcount == 1:
+                    held.append(job_id)
+            self.connection.execute(
+                "UPDATE workers SET last_seen = ? WHERE id = ?", (now, worker_id)
+            )
+        return held
+
+    def complete(self, job_id: int, worker_id: str, result: dict) -> bool:
+        """
+        Record a job's result.
+
+        Returns:
+            False if the worker no longer holds the lease; the result is then
+            discarded in favour of the worker that took the job over
+        """
+
+        now = time.time()
+        with self._transaction():
+            cursor = self.connection.execute(
+                "UPDATE jobs SET status = 'done', lease_owner = NULL,"
+                " lease_expires = NULL, error = NULL"
+                " WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (job_id, worker_id),
+            )
+            if cursor.rowcount != 1:
+                return False
+
+            self.connection.execute(
+                "INSERT INTO results (job_id, worker_id, result, finished_at)"
+                " VALUES (?, ?, ?, ?)",
+                (job_id, worker_id, json.dumps(result), now),
+            )
+            self.connection.execute(
+                "UPDATE workers SET completed = completed + 1, last_seen = ?"
+                " WHERE id = ?",
+                (now, worker_id),
+            )
+        return True
+
+    def fail(
+        self,
+        job_id: int,
+        worker_id: str,
+        error: str,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> bool:
+        """
+        Release a job that could not be graded.
+
+        The job goes back to pending unless it has used up ``max_attempts``,
+        in which case it is marked failed.
+
+        Returns:
+            False if the worker no longer holds the lease
+        """
+
+        now = time.time()
+        with self._transaction():
+            cursor = self.connection.execute(
+                "UPDATE jobs SET"
+                " status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,"
+                " lease_owner = NULL, lease_expires = NULL, error = ?"
+                " WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (max_attempts, error, job_id, worker_id),
+            )
+            if cursor.rowcount != 1:
+                return False
+
+            self.connection.execute(
+                "UPDATE workers SET failed = failed + 1, last_seen = ? WHERE id = ?",
+                (now, worker_id),
+            )
+        return True
+
+    def progress(self) -> dict:
+        """
+        Returns:
+            Dictionary with job counts by status ("expired" counts leased jobs
+            whose lease has run out) and per-worker completed/failed counts
+            and throughput in jobs per second
+        """
+
+        now = time.time()
+        counts = {"pending": 0, "leased": 0, "expired": 0, "done": 0, "failed": 0}
+        for row in self.connection.execute(
+            "SELECT status, lease_expires < ? AS expired, COUNT(*) AS count"
+            " FROM jobs GROUP BY status, expired",
+            (now,),
+        ):
+            status = row["status"]
+            if status == "leased" and row["expired"]:
+                status = "expired"
+            counts[status] = counts.get(status, 0) + row["count"]
+
+        workers = []
+        for row in self.connection.execute("SELECT * FROM workers ORDER BY started_at"):
+            elapsed = row["last_seen"] - row["started_at"]
+            workers.append(
+                {
+                    "id": row["id"],
+                    "host": row["host"],
+                    "pid": row["pid"],
+                    "completed": row["completed"],
+                    "failed": row["failed"],
+                    "throughput": row["completed"] / elapsed if elapsed > 0 else 0.0,
+                    "last_seen": row["last_seen"],
+                }
+            )
+
+        total = sum(counts.values())
+        return {
+            "jobs": counts,
+            "total": total,
+            "finished": (counts["done"] + counts["failed"]) / total if total else 0.0,
+            "workers": workers,
+        }
+
+    def results(self) -> Iterator[dict]:
+        """Yield every recorded result with its job's prompt and source"""
+
+        for row in self.connection.execute(
+            "SELECT jobs.id, jobs.prompt, jobs.source, results.worker_id,"
+            " results.result FROM results JOIN jobs ON jobs.id = results.job_id"
+            " ORDER BY jobs.id"
+        ):
+            yield {
+                "id": row["id"],
+                "prompt": row["prompt"],
+                "source": row["source"],
+                "worker_id": row["worker_id"],
+                "result": json.loads(row["result"]),
+            }
+
+
+def read_prompt_inputs(
+    paths: Iterable[str],
+    on_skip: Optional[Callable[[str, Exception], None]] = None,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Read prompts to enqueue.
+
+    ``.jsonl`` files hold one {"prompt": ..., "source": ...} object per line,
+    directories contribute every prompt file inside them (as for watch) and
+    any other file is a single prompt. Files inside a directory that cannot be
+    read or are not UTF-8 are skipped; files named explicitly must be readable.
+
+    Args:
+        paths: Files and directories to read
+        on_skip: Called with (path, error) for each skipped file
+
+    Yields:
+        (prompt, source) pairs
+    """
+
+    from .watch import scan_directory
+
+    for path in paths:
+        if os.path.isdir(path):
+            for rel in sorted(scan_directory(path)):
+                file_path = os.path.join(path, rel)
+                try:
+                    with open(file_path, "r", encoding="utf-8") as f:
+                        prompt = f.read().strip()
+                except (OSError, UnicodeDecodeError) as e:
+                    if on_skip is not None:
+                        on_skip(file_path, e)
+                    continue
+                yield prompt, file_path
+        elif path.endswith(".jsonl"):
+            with open(path, "r", encoding="utf-8") as f:
+                for number, line in enumerate(f, start=1):
+                    if line.strip():
+                        record = json.loads(line)
+                        yield record["prompt"], record.get("source", f"{path}:{number}")
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                yield f.read().strip(), path
+
+
+class _Transaction:
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.connection.execute("COMMIT")
+        else:
+            self.connection.execute("ROLLBACK")
+
+
+def run_worker(
+    path: str,
+    model: str = "gpt-5",
+    concurrency: int = 4,
+    lease: float = DEFAULT_LEASE,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    follow: bool = False,
+    poll_interval: float = 1.0,
+    grade_options: Optional[dict] = None,
+    on_result: Optional[Callable[[dict, Optional[dict], Optional[str]], None]] = None,
+    on_lease_lost: Optional[Callable[[dict], None]] = None,
+) -> str:
+    """
+    Grade jobs from a work queue until it is drained.
+
+    Keeps up to ``concurrency`` gradings in flight, claiming new jobs as
+    earlier ones finish. Leases of jobs still being graded are renewed every
+    third of ``lease``, so slow gradings are not taken over by other workers.
+    All database writes happen on the calling thread.
+
+    Args:
+        path: Queue database
+        model: OpenAI model to use
+        concurrency: Maximum number of grading requests in flight
+        lease: Seconds a claimed job stays reserved for this worker
+        max_attempts: Claims after which a failing job is marked failed
+        follow: Keep polling for new jobs instead of exiting once none are left
+        poll_interval: Seconds between polls when there is nothing to claim
+        grade_options: Extra keyword arguments for grade_prompt, e.g. criteria
+        on_result: Called with (job, result, error) as each job finishes
+        on_lease_lost: Called with the job instead of on_result when the
+            worker lost the job's lease before finishing it, e.g. after
+            stalling; its result was discarded
+
+    Returns:
+        The worker's id
+    """
+
+    from .prompt_grader import create_chat_model, grade_prompt
+
+    # Fail on a missing API key here rather than on, and for, every job
+    create_chat_model(model)
+
+    grade_options = grade_options or {}
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+    with WorkQueue(path) as queue, ThreadPoolExecutor(
+        max_workers=concurrency
+    ) as executor:
+        queue.register_worker(worker_id)
+        in_flight = {}
+        renewed_at = time.monotonic()
+
+        while True:
+            if len(in_flight) < concurrency:
+                for job in queue.claim(
+                    worker_id, concurrency - len(in_flight), lease, max_attempts
+                ):
+                    future = executor.submit(
+                        grade_prompt, job["prompt"], model, **grade_options
+                    )
+                    in_flight[future] = job
+
+            if not in_flight:
+                if not follow:
+                    return worker_id
+                time.sleep(poll_interval)
+                continue
+
+            done, _ = wait(
+                in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                job = in_flight.pop(future)
+                try:
+                    result = future.result()
+                    error = None if result else "No result received from the grading"
+                except Exception as e:
+                    result, error = None, str(e)
+
+                if error is None:
+                    held = queue.complete(job["id"], worker_id, result)
+                else:
+                    held = queue.fail(job["id"], worker_id, error, max_attempts)
+
+                if not held:
+                    if on_lease_lost is not None:
+                        on_lease_lost(job)
+                elif on_result is not None:
+                    on_result(job, result, error)
+
+            if in_flight and time.monotonic() - renewed_at >= lease / 3:
+                queue.renew(
+                    worker_id, (job["id"] for job in in_flight.values()), lease
+                )
+                renewed_at = time.monotonic()
@@ -111,6 +111,29 @@ st.markdown(
 )
 
 
+# Metric cards shown while a grading is streamed in
+LIVE_CARDS = [
+    ("ambiguity", "🎯 Ambiguity"),
+    ("contradictions", "⚠️ Contradictions"),
+    ("context", "🔄 Context"),
+    ("grammar", "📝 Grammar"),
+]
+
+
+def render_live_scores(placeholder, scores):
+    """Render the metric cards for the scores received so far"""
+    cards = "".join(
+        f"""
+        <div class="metric-card">
+            <div class="metric-label">{label}</div>
+            <div class="score-display">{f"{scores[key]}/10" if key in scores else "…"}</div>
+        </div>
+        """
+        for key, label in LIVE_CARDS
+    )
+    placeholder.markdown(cards, unsafe_allow_html=True)
+
+
 def main():
     # Initialize session state for API key
     if "api_key" not in st.session_state:
@@ -223,7 +246,18 @@ def main():
             else:
                 with st.spinner("🔍 Analyzing your prompt..."):
                     try:
-                        result = grade_prompt(prompt_text, model)
+                        # Fill the metric cards as each score is generated
+                        live_scores = {}
+                        live_placeholder = col2.empty()
+                        render_live_scores(live_placeholder, live_scores)
+
+                        def on_field(name, value):
+                            criterion, _, kind = name.rpartition("_")
+                            if kind == "score":
+                                live_scores[criterion] = value
+                                render_live_scores(live_placeholder, live_scores)
+
+                        result = grade_prompt(prompt_text, model, on_field=on_field)
 
                         if result:
                             st.session_state.grading_result = result
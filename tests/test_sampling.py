@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+from prompt_os.sampling import sample_until_consistent
+
+CRITERIA = ["ambiguity", "grammar"]
+
+
+def grading(ambiguity, grammar=8):
+    return {
+        "ambiguity": {"score": ambiguity, "explanation": f"ambiguity {ambiguity}"},
+        "grammar": {"score": grammar, "explanation": f"grammar {grammar}"},
+        "overall_assessment": f"assessment {ambiguity}",
+    }
+
+
+def grader(outcomes):
+    """grade_once returning (or raising) the given outcomes in order"""
+
+    outcomes = iter(outcomes)
+    lock = threading.Lock()
+
+    def grade_once():
+        with lock:
+            outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return grade_once
+
+
+def test_stops_after_first_wave_when_scores_agree():
+    grade_once = grader([grading(7), grading(8)] + [grading(1)] * 4)
+    result = sample_until_consistent(grade_once, CRITERIA, max_samples=6)
+
+    assert result["sampling"] == {
+        "samples_used": 2,
+        "max_samples": 6,
+        "tolerance": 1,
+        "agreed": True,
+        "errors": 0,
+    }
+    assert sorted(result["ambiguity"]["samples"]) == [7, 8]
+    assert result["ambiguity"]["score"] == 7
+    assert result["ambiguity"]["variance"] == pytest.approx(0.5)
+    assert "overall_score" not in result
+
+
+def test_keeps_sampling_until_max_when_scores_disagree():
+    grade_once = grader([grading(2), grading(9), grading(5), grading(9), grading(9)])
+    result = sample_until_consistent(grade_once, CRITERIA, max_samples=5)
+
+    assert result["sampling"]["samples_used"] == 5
+    assert result["sampling"]["agreed"] is False
+    assert result["ambiguity"]["score"] == 9
+    assert result["grammar"]["variance"] == 0
+
+
+def test_errors_count_as_drawn_samples():
+    grade_once = grader([RuntimeError("boom"), grading(6), grading(6), grading(6)])
+    result = sample_until_consistent(grade_once, CRITERIA, max_samples=4)
+
+    assert result["sampling"]["samples_used"] == 4
+    assert result["sampling"]["errors"] == 1
+    assert result["sampling"]["agreed"] is True
+    assert result["ambiguity"]["samples"] == [6, 6, 6]
+
+
+def test_raises_when_every_sample_fails():
+    grade_once = grader([RuntimeError("boom")] * 3)
+    with pytest.raises(RuntimeError, match="boom"):
+        sample_until_consistent(grade_once, CRITERIA, max_samples=3)
+
+
+def test_returns_none_without_results():
+    grade_once = grader([None, None])
+    assert sample_until_consistent(grade_once, CRITERIA, max_samples=2) is None
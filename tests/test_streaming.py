@@ -0,0 +1,60 @@
+import json
+import random
+
+import pytest
+
+from prompt_os.streaming import PartialArgsParser
+
+ARGS = {
+    "ambiguity_score": 7,
+    "ambiguity_explanation": 'Says "short" but asks for 1500 words, {unclear}.',
+    "latency": 1500.05,
+    "ratio": -2.5e-3,
+    "big": 1e10,
+    "flag": True,
+    "missing": None,
+    "grammar_score": 10,
+    "overall_assessment": "Needs work",
+}
+
+
+def feed_in_chunks(text, cuts):
+    parser = PartialArgsParser()
+    fields = []
+    start = 0
+    for cut in sorted(cuts) + [len(text)]:
+        fields.extend(parser.feed(text[start:cut]))
+        start = cut
+    return parser, fields
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_random_chunking_yields_every_field_once(indent):
+    text = json.dumps(ARGS, indent=indent)
+    rng = random.Random(0)
+    for _ in range(2000):
+        cuts = rng.sample(range(1, len(text)), rng.randint(1, min(40, len(text) - 1)))
+        parser, fields = feed_in_chunks(text, cuts)
+        assert fields == list(ARGS.items()), cuts
+        assert parser.finished
+
+
+def test_every_single_split_point():
+    text = json.dumps(ARGS)
+    for cut in range(1, len(text)):
+        _, fields = feed_in_chunks(text, [cut])
+        assert fields == list(ARGS.items()), cut
+
+
+def test_number_waits_for_its_delimiter():
+    parser = PartialArgsParser()
+    assert parser.feed('{"a": 1500') == []
+    assert parser.feed(".") == []
+    assert parser.feed("5 ") == []
+    assert parser.feed(', "b": 2') == [("a", 1500.5)]
+    assert parser.feed("}") == [("b", 2)]
+
+
+def test_rejects_non_object():
+    with pytest.raises(ValueError):
+        PartialArgsParser().feed("[1, 2]")
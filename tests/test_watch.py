@@ -0,0 +1,95 @@
+import os
+
+from prompt_os.watch import Manifest, scan_directory
+
+
+def write(directory, name, text):
+    path = directory / name
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def graded(manifest, *names):
+    for name in names:
+        manifest.files[name]["result"] = {"overall_score": 8}
+
+
+def test_new_files_are_pending(tmp_path):
+    write(tmp_path, "a.txt", "first prompt")
+    write(tmp_path, "b.md", "second prompt")
+
+    manifest = Manifest(str(tmp_path))
+    assert manifest.plan(scan_directory(str(tmp_path))) == ["a.txt", "b.md"]
+    assert manifest.dirty
+
+
+def test_unchanged_graded_files_are_skipped(tmp_path):
+    write(tmp_path, "a.txt", "first prompt")
+    manifest = Manifest(str(tmp_path))
+    manifest.plan(scan_directory(str(tmp_path)))
+    graded(manifest, "a.txt")
+    manifest.dirty = False
+
+    assert manifest.plan(scan_directory(str(tmp_path))) == []
+    assert not manifest.dirty
+
+
+def test_ungraded_files_are_planned_again(tmp_path):
+    write(tmp_path, "a.txt", "first prompt")
+    manifest = Manifest(str(tmp_path))
+    manifest.plan(scan_directory(str(tmp_path)))
+
+    assert manifest.plan(scan_directory(str(tmp_path))) == ["a.txt"]
+
+
+def test_touched_file_with_same_content_only_refreshes_stat(tmp_path):
+    path = write(tmp_path, "a.txt", "first prompt")
+    manifest = Manifest(str(tmp_path))
+    manifest.plan(scan_directory(str(tmp_path)))
+    graded(manifest, "a.txt")
+
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    snapshot = scan_directory(str(tmp_path))
+
+    assert manifest.plan(snapshot) == []
+    assert manifest.files["a.txt"]["mtime_ns"] == snapshot["a.txt"][0]
+    assert manifest.files["a.txt"]["result"] == {"overall_score": 8}
+
+
+def test_modified_file_is_pending(tmp_path):
+    path = write(tmp_path, "a.txt", "first prompt")
+    manifest = Manifest(str(tmp_path))
+    manifest.plan(scan_directory(str(tmp_path)))
+    graded(manifest, "a.txt")
+
+    path.write_text("first prompt, now longer", encoding="utf-8")
+
+    assert manifest.plan(scan_directory(str(tmp_path))) == ["a.txt"]
+    assert manifest.files["a.txt"]["result"] is None
+
+
+def test_unreadable_file_is_retried_only_once_it_changes(tmp_path):
+    path = write(tmp_path, "a.txt", "first prompt")
+    manifest = Manifest(str(tmp_path))
+    manifest.plan(scan_directory(str(tmp_path)))
+    manifest.files["a.txt"]["error"] = "UnicodeDecodeError: invalid start byte"
+
+    assert manifest.plan(scan_directory(str(tmp_path))) == []
+
+    path.write_text("first prompt, fixed", encoding="utf-8")
+    assert manifest.plan(scan_directory(str(tmp_path))) == ["a.txt"]
+
+
+def test_deleted_files_are_dropped(tmp_path):
+    path = write(tmp_path, "a.txt", "first prompt")
+    manifest = Manifest(str(tmp_path))
+    manifest.plan(scan_directory(str(tmp_path)))
+    graded(manifest, "a.txt")
+    manifest.dirty = False
+
+    path.unlink()
+
+    assert manifest.plan(scan_directory(str(tmp_path))) == []
+    assert manifest.files == {}
+    assert manifest.dirty
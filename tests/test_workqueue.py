@@ -0,0 +1,141 @@
+import pytest
+
+from prompt_os.fake_backend import fake_chat_model_factory
+from prompt_os.prompt_grader import set_chat_model_factory
+from prompt_os.workqueue import WorkQueue, read_prompt_inputs, run_worker
+
+# A negative lease has already expired when the claim returns
+EXPIRED = -1.0
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "queue.db")
+
+
+@pytest.fixture
+def queue(db_path):
+    with WorkQueue(db_path) as queue:
+        queue.register_worker("a")
+        queue.register_worker("b")
+        yield queue
+
+
+@pytest.fixture
+def fake_backend():
+    previous = set_chat_model_factory(
+        fake_chat_model_factory(base_latency=0, seconds_per_output_token=0)
+    )
+    yield
+    set_chat_model_factory(previous)
+
+
+def job_row(queue, job_id):
+    return queue.connection.execute(
+        "SELECT * FROM jobs WHERE id = ?", (job_id,)
+    ).fetchone()
+
+
+def test_expired_lease_is_taken_over(queue):
+    queue.enqueue([("first prompt", None)])
+    (job,) = queue.claim("a", lease=EXPIRED)
+
+    (taken,) = queue.claim("b")
+    assert taken["id"] == job["id"]
+    assert taken["attempts"] == 2
+    assert job_row(queue, job["id"])["lease_owner"] == "b"
+
+
+def test_live_lease_is_not_taken_over(queue):
+    queue.enqueue([("first prompt", None)])
+    queue.claim("a")
+    assert queue.claim("b") == []
+
+
+def test_complete_and_fail_after_losing_the_lease(queue):
+    queue.enqueue([("first prompt", None), ("second prompt", None)])
+    first, second = queue.claim("a", limit=2, lease=EXPIRED)
+    queue.claim("b", limit=2)
+
+    assert queue.complete(first["id"], "a", {"overall_score": 1}) is False
+    assert queue.fail(second["id"], "a", "boom") is False
+    assert list(queue.results()) == []
+
+    assert queue.complete(first["id"], "b", {"overall_score": 2}) is True
+    (result,) = queue.results()
+    assert result["worker_id"] == "b"
+    assert result["result"] == {"overall_score": 2}
+
+    # A job can only be completed once
+    assert queue.complete(first["id"], "b", {"overall_score": 3}) is False
+
+
+def test_renew_keeps_held_leases_only(queue):
+    queue.enqueue([("first prompt", None), ("second prompt", None)])
+    first, second = queue.claim("a", limit=2, lease=EXPIRED)
+    queue.claim("b", limit=1)
+
+    assert queue.renew("a", [first["id"], second["id"]]) == [second["id"]]
+    assert queue.claim("b") == []
+
+
+def test_expired_job_fails_after_max_attempts(queue):
+    queue.enqueue([("first prompt", None)])
+    (job,) = queue.claim("a", lease=EXPIRED, max_attempts=2)
+    queue.claim("b", lease=EXPIRED, max_attempts=2)
+
+    assert queue.claim("a", max_attempts=2) == []
+    row = job_row(queue, job["id"])
+    assert row["status"] == "failed"
+    assert row["error"] == "Lease expired"
+    assert queue.progress()["jobs"]["failed"] == 1
+
+
+def test_failing_job_is_retried_until_max_attempts(queue):
+    queue.enqueue([("first prompt", None)])
+    (job,) = queue.claim("a", max_attempts=2)
+    assert queue.fail(job["id"], "a", "boom", max_attempts=2) is True
+    assert job_row(queue, job["id"])["status"] == "pending"
+
+    (job,) = queue.claim("b", max_attempts=2)
+    assert queue.fail(job["id"], "b", "boom again", max_attempts=2) is True
+    row = job_row(queue, job["id"])
+    assert row["status"] == "failed"
+    assert row["error"] == "boom again"
+    assert queue.claim("a", max_attempts=2) == []
+
+
+def test_run_worker_drains_the_queue(db_path, fake_backend):
+    prompts = [(f"Summarise document number {i} in one line.", str(i)) for i in range(5)]
+    with WorkQueue(db_path) as queue:
+        queue.enqueue(prompts)
+
+    finished = []
+    run_worker(
+        db_path,
+        model="fake",
+        concurrency=2,
+        on_result=lambda job, result, error: finished.append((job["source"], error)),
+    )
+
+    assert sorted(finished) == [(source, None) for _, source in prompts]
+    with WorkQueue(db_path) as queue:
+        progress = queue.progress()
+        assert progress["jobs"]["done"] == 5
+        assert progress["finished"] == 1.0
+        assert [result["source"] for result in queue.results()] == ["0", "1", "2", "3", "4"]
+
+
+def test_read_prompt_inputs_skips_unreadable_directory_files(tmp_path):
+    prompts = tmp_path / "prompts"
+    prompts.mkdir()
+    (prompts / "good.txt").write_text("A readable prompt.", encoding="utf-8")
+    (prompts / "bad.txt").write_bytes(b"\xff\xfe not utf-8")
+
+    skipped = []
+    read = list(
+        read_prompt_inputs([str(prompts)], on_skip=lambda path, e: skipped.append(path))
+    )
+
+    assert read == [("A readable prompt.", str(prompts / "good.txt"))]
+    assert skipped == [str(prompts / "bad.txt")]